@@ -0,0 +1,41 @@
+import glob
+
+import pandas as pd
+from pandas import DataFrame
+from ta.volatility import BollingerBands
+
+from app.strategies.scalpel.signals import add_indicators
+
+
+def read_historical_data(data_path: str) -> DataFrame:
+    dfs = []
+    filenames = glob.glob(data_path + "/*.csv")
+    for filename in filenames:
+        data = pd.read_csv(
+            filename,
+            delimiter=";",
+            header=0,
+            names=["UID", "Time", "Open", "Close", "High", "Low", "Volume", "NaN"],
+        )
+        dfs.append(data)
+
+    big_frame = pd.concat(dfs, ignore_index=True).dropna(axis=1)
+    big_frame["Time"] = big_frame["Time"].str.replace("Z", "")
+    big_frame["Time"] = big_frame["Time"].str.replace("T", " ")
+    big_frame["Time"] = pd.to_datetime(big_frame["Time"], format="%Y-%m-%d %H:%M:%S")
+    big_frame.set_index("Time", inplace=True)
+    return big_frame[big_frame.High != big_frame.Low]
+
+
+def create_df(data_path: str) -> DataFrame:
+    big_frame = add_indicators(read_historical_data(data_path))
+    bbands = BollingerBands(close=big_frame["Close"], window=14, window_dev=2)
+    return big_frame.join(
+        [
+            bbands.bollinger_hband(),
+            bbands.bollinger_lband(),
+            bbands.bollinger_mavg(),
+            bbands.bollinger_pband(),
+            bbands.bollinger_wband(),
+        ]
+    )
@@ -0,0 +1,199 @@
+import itertools
+import json
+import os
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from typing import Dict, Iterable, Iterator, List, Optional, Sequence
+
+import numpy as np
+from pandas import DataFrame
+
+from app.backtest.simulator import simulate
+
+SIMULATION_COLUMNS = ["Open", "High", "Low", "Close", "ATR", "TotalSignal"]
+# Number of float64 elements of one Monte Carlo batch array, about 16 MB.
+MONTE_CARLO_BATCH_ELEMENTS = 2_000_000
+
+_df: Optional[DataFrame] = None
+_returns: Optional[np.ndarray] = None
+_cash: float = 100_000
+
+
+def get_metrics(trades: DataFrame, equity: np.ndarray, cash: float) -> dict:
+    drawdown = 1 - equity / np.maximum.accumulate(equity)
+    return {
+        "return_pct": float((equity[-1] / cash - 1) * 100),
+        "max_drawdown_pct": float(drawdown.max() * 100),
+        "trades": len(trades),
+        "win_rate_pct": (
+            float((trades["PnL"] > 0).mean() * 100) if len(trades) else None
+        ),
+    }
+
+
+def walk_forward_scenarios(
+    bars: int,
+    train_bars: int,
+    test_bars: int,
+    grid: Dict[str, Sequence[float]],
+) -> Iterator[dict]:
+    for window, start in enumerate(
+        range(0, bars - train_bars - test_bars + 1, test_bars)
+    ):
+        yield {
+            "kind": "walk_forward",
+            "window": window,
+            "train": [start, start + train_bars],
+            "test": [start + train_bars, start + train_bars + test_bars],
+            "grid": grid,
+        }
+
+
+def monte_carlo_scenarios(
+    scenarios: int, chunk_size: int = 1000, seed: int = 0
+) -> Iterator[dict]:
+    for chunk, start in enumerate(range(0, scenarios, chunk_size)):
+        yield {
+            "kind": "monte_carlo",
+            "first": start,
+            "count": min(chunk_size, scenarios - start),
+            "seed": seed + chunk,
+        }
+
+
+def perturbation_scenarios(
+    scenarios: int,
+    commission: Sequence[float] = (0.0, 0.001),
+    slippage: Sequence[float] = (0.0, 0.001),
+    seed: int = 0,
+    **params,
+) -> Iterator[dict]:
+    rng = np.random.default_rng(seed)
+    for scenario in range(scenarios):
+        yield {
+            "kind": "perturbation",
+            "scenario": scenario,
+            "params": {
+                "commission": float(rng.uniform(*commission)),
+                "slippage": float(rng.uniform(*slippage)),
+                **params,
+            },
+        }
+
+
+def init_worker(df: DataFrame, returns: np.ndarray, cash: float):
+    global _df, _returns, _cash
+    _df, _returns, _cash = df, returns, cash
+
+
+def run_walk_forward(scenario: dict) -> List[dict]:
+    train = _df.iloc[slice(*scenario["train"])]
+    test = _df.iloc[slice(*scenario["test"])]
+    names = list(scenario["grid"])
+    best_params, best_metrics = None, None
+    for values in itertools.product(*scenario["grid"].values()):
+        params = dict(zip(names, values))
+        metrics = get_metrics(*simulate(train, cash=_cash, **params), _cash)
+        if best_metrics is None or metrics["return_pct"] > best_metrics["return_pct"]:
+            best_params, best_metrics = params, metrics
+    return [
+        {
+            "kind": "walk_forward",
+            "window": scenario["window"],
+            "train_start": str(train.index[0]),
+            "test_start": str(test.index[0]),
+            "test_end": str(test.index[-1]),
+            "params": best_params,
+            "train": best_metrics,
+            "test": get_metrics(*simulate(test, cash=_cash, **best_params), _cash),
+        }
+    ]
+
+
+def run_monte_carlo(scenario: dict) -> List[dict]:
+    if len(_returns) == 0:
+        return []
+    rng = np.random.default_rng(scenario["seed"])
+    batch_size = max(1, MONTE_CARLO_BATCH_ELEMENTS // len(_returns))
+    results = []
+    for first in range(0, scenario["count"], batch_size):
+        count = min(batch_size, scenario["count"] - first)
+        equity = rng.choice(_returns, size=(count, len(_returns)))
+        equity += 1
+        np.cumprod(equity, axis=1, out=equity)
+        peak = np.maximum.accumulate(equity, axis=1)
+        np.divide(equity, peak, out=peak)
+        results.extend(
+            {
+                "kind": "monte_carlo",
+                "scenario": scenario["first"] + first + i,
+                "return_pct": float((final - 1) * 100),
+                "max_drawdown_pct": float((1 - min_ratio) * 100),
+            }
+            for i, (final, min_ratio) in enumerate(zip(equity[:, -1], peak.min(axis=1)))
+        )
+    return results
+
+
+def run_perturbation(scenario: dict) -> List[dict]:
+    trades, equity = simulate(_df, cash=_cash, **scenario["params"])
+    return [
+        {
+            "kind": "perturbation",
+            "scenario": scenario["scenario"],
+            "params": scenario["params"],
+            **get_metrics(trades, equity, _cash),
+        }
+    ]
+
+
+SCENARIO_RUNNERS = {
+    "walk_forward": run_walk_forward,
+    "monte_carlo": run_monte_carlo,
+    "perturbation": run_perturbation,
+}
+
+
+def run_scenario(scenario: dict) -> List[dict]:
+    return SCENARIO_RUNNERS[scenario["kind"]](scenario)
+
+
+def run_scenarios(
+    df: DataFrame,
+    scenarios: Iterable[dict],
+    output_path: str,
+    cash: float = 100_000,
+    workers: Optional[int] = None,
+    max_pending: Optional[int] = None,
+    **params,
+) -> int:
+    """Runs scenarios in a process pool and writes results to a JSON lines file,
+    replacing its previous content.
+
+    Scenarios are consumed lazily and at most `max_pending` of them are in
+    flight, so memory does not grow with the number of scenarios.
+    """
+    df = df[SIMULATION_COLUMNS]
+    trades, _ = simulate(df, cash=cash, **params)
+    returns = trades["ReturnPct"].to_numpy()
+    scenarios = iter(scenarios)
+    workers = workers or os.cpu_count() or 1
+    max_pending = max_pending or workers * 2
+    written = 0
+    with ProcessPoolExecutor(
+        max_workers=workers,
+        initializer=init_worker,
+        initargs=(df, returns, cash),
+    ) as executor, open(output_path, "w") as output:
+        pending = set()
+        while True:
+            for scenario in itertools.islice(scenarios, max_pending - len(pending)):
+                pending.add(executor.submit(run_scenario, scenario))
+            if not pending:
+                break
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                for result in future.result():
+                    output.write(json.dumps(result) + "\n")
+                    written += 1
+            output.flush()
+    return written
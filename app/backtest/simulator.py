@@ -0,0 +1,174 @@
+import sys
+from math import copysign
+from typing import Optional, Tuple
+
+import numpy as np
+import pandas as pd
+from backtesting._stats import compute_stats
+from pandas import DataFrame
+
+from app.backtest.strategy import ScalpelBacktestStrategy
+
+FULL_EQUITY = 1 - sys.float_info.epsilon
+SEARCH_WINDOW = 64
+
+
+def find_exit(
+    high: np.ndarray,
+    low: np.ndarray,
+    start: int,
+    sl: float,
+    tp: float,
+    is_long: bool,
+) -> Optional[Tuple[int, bool]]:
+    n = len(high)
+    window = SEARCH_WINDOW
+    while start < n:
+        stop = min(start + window, n)
+        if is_long:
+            sl_hit = low[start:stop] < sl
+            tp_hit = high[start:stop] > tp
+        else:
+            sl_hit = high[start:stop] > sl
+            tp_hit = low[start:stop] < tp
+        hit = sl_hit | tp_hit
+        if hit.any():
+            k = int(hit.argmax())
+            return start + k, bool(sl_hit[k])
+        start = stop
+        window *= 2
+    return None
+
+
+def simulate(
+    df: DataFrame,
+    cash: float = 100_000,
+    commission: float = 0.0,
+    slippage: float = 0.0,
+    slcoef: float = ScalpelBacktestStrategy.slcoef,
+    tpsl_ratio: float = ScalpelBacktestStrategy.TPSLRatio,
+) -> Tuple[DataFrame, np.ndarray]:
+    """Replays ScalpelBacktestStrategy on `df` without a per-bar loop.
+
+    Follows backtesting.py order semantics: an entry signalled on bar i fills
+    at the next bar's open, SL/TP are checked from the entry bar on (SL first
+    when both are hit), and a trade left open at the end is closed at the last
+    bar's open. `slippage` moves every fill price against the trade by the
+    given fraction.
+    """
+    open_ = df["Open"].to_numpy(dtype=float)
+    high = df["High"].to_numpy(dtype=float)
+    low = df["Low"].to_numpy(dtype=float)
+    close = df["Close"].to_numpy(dtype=float)
+    atr = df["ATR"].to_numpy(dtype=float)
+    signal = df["TotalSignal"].to_numpy()
+    n = len(df)
+
+    signal_bars = np.flatnonzero(signal[1:]) + 1
+    trades = []
+    open_trade = None
+    position = 1
+    while True:
+        k = np.searchsorted(signal_bars, position)
+        if k == len(signal_bars):
+            break
+        i = int(signal_bars[k])
+        is_long = signal[i] == 2
+        slatr = slcoef * atr[i]
+        if is_long:
+            sl = close[i] - slatr
+            tp = close[i] + slatr * tpsl_ratio
+            valid = sl < close[i] * (1 + commission) < tp
+        else:
+            sl = close[i] + slatr
+            tp = close[i] - slatr * tpsl_ratio
+            valid = tp < close[i] * (1 - commission) < sl
+        if not valid:
+            position = i + 1
+            continue
+
+        entry_bar = min(i + 1, n - 1)
+        direction = 1 if is_long else -1
+        entry_price = open_[entry_bar] * (1 + copysign(commission, direction))
+        entry_price *= 1 + slippage * direction
+        size = direction * int((cash * FULL_EQUITY) // entry_price)
+        if not size:
+            position = i + 1
+            continue
+
+        exit_hit = find_exit(high, low, entry_bar, sl, tp, is_long)
+        if exit_hit is not None:
+            exit_bar, is_sl = exit_hit
+            if is_sl:
+                exit_price = (
+                    min(open_[exit_bar], sl) if is_long else max(open_[exit_bar], sl)
+                )
+            else:
+                exit_price = (
+                    max(open_[exit_bar], tp) if is_long else min(open_[exit_bar], tp)
+                )
+        elif i < n - 1:
+            exit_bar, exit_price = n - 1, open_[n - 1]
+        else:
+            open_trade = (size, entry_bar, entry_price)
+            break
+        exit_price *= 1 - slippage * direction
+        pnl = size * (exit_price - entry_price)
+        trades.append((size, entry_bar, exit_bar, entry_price, exit_price, pnl))
+        cash += pnl
+        if exit_hit is None or i == n - 1:
+            break
+        position = exit_bar
+
+    trades_df = DataFrame(
+        trades,
+        columns=["Size", "EntryBar", "ExitBar", "EntryPrice", "ExitPrice", "PnL"],
+    ).astype(
+        {
+            "Size": int,
+            "EntryBar": int,
+            "ExitBar": int,
+            "EntryPrice": float,
+            "ExitPrice": float,
+            "PnL": float,
+        }
+    )
+    trades_df["ReturnPct"] = np.sign(trades_df["Size"]) * (
+        trades_df["ExitPrice"] / trades_df["EntryPrice"] - 1
+    )
+    trades_df["EntryTime"] = df.index[trades_df["EntryBar"]]
+    trades_df["ExitTime"] = df.index[trades_df["ExitBar"]]
+    trades_df["Duration"] = trades_df["ExitTime"] - trades_df["EntryTime"]
+    return trades_df, get_equity(
+        trades_df, close, cash - trades_df["PnL"].sum(), open_trade
+    )
+
+
+def get_equity(
+    trades: DataFrame,
+    close: np.ndarray,
+    cash: float,
+    open_trade: Optional[Tuple[int, int, float]] = None,
+) -> np.ndarray:
+    realized = np.zeros(len(close))
+    np.add.at(realized, trades["ExitBar"].to_numpy(), trades["PnL"].to_numpy())
+    equity = cash + np.cumsum(realized)
+    for size, entry_bar, exit_bar, entry_price in zip(
+        trades["Size"], trades["EntryBar"], trades["ExitBar"], trades["EntryPrice"]
+    ):
+        equity[entry_bar:exit_bar] += size * (close[entry_bar:exit_bar] - entry_price)
+    if open_trade is not None:
+        size, entry_bar, entry_price = open_trade
+        equity[entry_bar:] += size * (close[entry_bar:] - entry_price)
+    return equity
+
+
+def run_backtest(df: DataFrame, cash: float = 100_000, **kwargs) -> pd.Series:
+    trades, equity = simulate(df, cash=cash, **kwargs)
+    return compute_stats(
+        trades=trades,
+        equity=equity,
+        ohlc_data=df,
+        strategy_instance=None,
+        risk_free_rate=0.0,
+    )
@@ -0,0 +1,24 @@
+from backtesting import Strategy
+
+
+class ScalpelBacktestStrategy(Strategy):
+    trade_size = 25
+    slcoef = 1.0
+    TPSLRatio = 1.0
+
+    def init(self):
+        super().init()
+        self.signal1 = self.I(lambda: self.data.TotalSignal, name="TotalSignal")
+
+    def next(self):
+        super().next()
+        slatr = self.slcoef * self.data.ATR[-1]
+        TPSLRatio = self.TPSLRatio
+        if self.signal1 == 2 and len(self.trades) == 0:
+            sl1 = self.data.Close[-1] - slatr
+            tp1 = self.data.Close[-1] + slatr * TPSLRatio
+            self.buy(sl=sl1, tp=tp1)
+        elif self.signal1 == 1 and len(self.trades) == 0:
+            sl1 = self.data.Close[-1] + slatr
+            tp1 = self.data.Close[-1] - slatr * TPSLRatio
+            self.sell(sl=sl1, tp=tp1)
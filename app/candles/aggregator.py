@@ -0,0 +1,88 @@
+from collections import deque
+from datetime import datetime, timedelta, timezone
+from typing import Deque, List, Optional
+
+from app.candles.models import Candle, candles_from_arrays, candles_to_arrays
+
+EPOCH = datetime(1970, 1, 1, tzinfo=timezone.utc)
+
+
+class CandleAggregator:
+    """Builds candles of a higher timeframe from a stream of base candles.
+
+    Base candles must arrive in time order. A candle with the same time as the
+    previous one replaces it, so the open bucket follows an unfinished base
+    candle without recalculating the whole bucket.
+    """
+
+    def __init__(self, interval: timedelta, maxlen: Optional[int] = None):
+        self.interval = interval
+        self.candles: Deque[Candle] = deque(maxlen=maxlen)
+        self._bucket_time: Optional[datetime] = None
+        self._sealed: Optional[Candle] = None
+        self._last: Optional[Candle] = None
+
+    def bucket_time(self, time: datetime) -> datetime:
+        return time - (time - EPOCH) % self.interval
+
+    @property
+    def current(self) -> Optional[Candle]:
+        if self._last is None:
+            return None
+        if self._sealed is None:
+            return Candle(
+                time=self._bucket_time,
+                open=self._last.open,
+                high=self._last.high,
+                low=self._last.low,
+                close=self._last.close,
+                volume=self._last.volume,
+            )
+        return Candle(
+            time=self._bucket_time,
+            open=self._sealed.open,
+            high=max(self._sealed.high, self._last.high),
+            low=min(self._sealed.low, self._last.low),
+            close=self._last.close,
+            volume=self._sealed.volume + self._last.volume,
+        )
+
+    def update(self, candle: Candle):
+        if self._last is not None:
+            if candle.time < self._last.time:
+                return
+            if candle.time == self._last.time:
+                self._last = candle
+                return
+            bucket_time = self.bucket_time(candle.time)
+            if bucket_time == self._bucket_time:
+                self._sealed = self.current
+                self._last = candle
+                return
+            self.candles.append(self.current)
+            self._sealed = None
+            self._bucket_time = bucket_time
+        else:
+            self._bucket_time = self.bucket_time(candle.time)
+        self._last = candle
+
+    def get_candles(self) -> List[Candle]:
+        candles = list(self.candles)
+        if self._last is not None:
+            candles.append(self.current)
+        return candles
+
+    def get_state(self) -> dict:
+        return {
+            "candles": candles_to_arrays(self.candles),
+            "bucket_time": self._bucket_time,
+            "sealed": self._sealed,
+            "last": self._last,
+        }
+
+    def set_state(self, state: dict):
+        self.candles.clear()
+        self.candles.extend(candles_from_arrays(state["candles"]))
+        self._bucket_time = state["bucket_time"]
+        self._sealed = state["sealed"]
+        self._last = state["last"]
@@ -0,0 +1,45 @@
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from typing import Dict, Iterable, List
+
+import numpy as np
+from tinkoff.invest import CandleInterval
+
+BASE_CANDLE_INTERVALS = {
+    1: CandleInterval.CANDLE_INTERVAL_1_MIN,
+    5: CandleInterval.CANDLE_INTERVAL_5_MIN,
+}
+
+
+@dataclass
+class Candle:
+    time: datetime
+    open: float
+    high: float
+    low: float
+    close: float
+    volume: int
+
+
+def candles_to_arrays(candles: Iterable[Candle]) -> Dict[str, np.ndarray]:
+    candles = list(candles)
+    return {
+        "time": np.array([int(i.time.timestamp()) for i in candles], dtype=np.int64),
+        "prices": np.array(
+            [(i.open, i.high, i.low, i.close) for i in candles], dtype=np.float64
+        ).reshape(-1, 4),
+        "volume": np.array([i.volume for i in candles], dtype=np.int64),
+    }
+
+
+def candles_from_arrays(arrays: Dict[str, np.ndarray]) -> List[Candle]:
+    return [
+        Candle(
+            datetime.fromtimestamp(time, timezone.utc), open, high, low, close, volume
+        )
+        for time, (open, high, low, close), volume in zip(
+            arrays["time"].tolist(),
+            arrays["prices"].tolist(),
+            arrays["volume"].tolist(),
+        )
+    ]
@@ -0,0 +1,103 @@
+from collections import deque
+from datetime import datetime, timedelta
+from typing import Deque, Dict, Iterable, List, Optional
+
+from pandas import DataFrame
+from tinkoff.invest import HistoricCandle
+
+from app.candles.aggregator import CandleAggregator
+from app.candles.models import Candle, candles_from_arrays, candles_to_arrays
+from app.utils.quotation import quotation_to_float
+
+
+def candle_from_historic(candle: HistoricCandle) -> Candle:
+    return Candle(
+        time=candle.time,
+        open=quotation_to_float(candle.open),
+        high=quotation_to_float(candle.high),
+        low=quotation_to_float(candle.low),
+        close=quotation_to_float(candle.close),
+        volume=candle.volume,
+    )
+
+
+def candles_to_df(candles: List[Candle]) -> DataFrame:
+    df = DataFrame(
+        [(i.time, i.open, i.high, i.low, i.close, i.volume) for i in candles],
+        columns=["Time", "Open", "High", "Low", "Close", "Volume"],
+    )
+    return df[df.High != df.Low]
+
+
+class CandleStore:
+    """Keeps a window of base candles and the higher timeframes built from it.
+
+    Base candles are trimmed to the strategy window with `trim`, aggregated
+    timeframes keep up to `aggregated_maxlen` candles of their own.
+    """
+
+    def __init__(
+        self,
+        base_interval: int,
+        intervals: Iterable[int] = (),
+        aggregated_maxlen: int = 1000,
+    ):
+        self.base_interval = base_interval
+        self.candles: Deque[Candle] = deque()
+        self.aggregators: Dict[int, CandleAggregator] = {
+            interval: CandleAggregator(
+                timedelta(minutes=interval), maxlen=aggregated_maxlen
+            )
+            for interval in intervals
+        }
+
+    @property
+    def last(self) -> Optional[Candle]:
+        return self.candles[-1] if self.candles else None
+
+    def update(self, candle: Candle):
+        last = self.last
+        if last is not None:
+            if candle.time < last.time:
+                return
+            if candle.time == last.time:
+                self.candles[-1] = candle
+            else:
+                self.candles.append(candle)
+        else:
+            self.candles.append(candle)
+        for aggregator in self.aggregators.values():
+            aggregator.update(candle)
+
+    def trim(self, since: datetime):
+        while self.candles and self.candles[0].time < since:
+            self.candles.popleft()
+
+    def get_candles(self, interval: Optional[int] = None) -> List[Candle]:
+        if interval is None or interval == self.base_interval:
+            return list(self.candles)
+        return self.aggregators[interval].get_candles()
+
+    def to_df(self, interval: Optional[int] = None) -> DataFrame:
+        return candles_to_df(self.get_candles(interval))
+
+    def get_state(self) -> dict:
+        return {
+            "base_interval": self.base_interval,
+            "candles": candles_to_arrays(self.candles),
+            "aggregators": {
+                interval: aggregator.get_state()
+                for interval, aggregator in self.aggregators.items()
+            },
+        }
+
+    def set_state(self, state: dict) -> bool:
+        if (
+            state["base_interval"] != self.base_interval
+            or state["aggregators"].keys() != self.aggregators.keys()
+        ):
+            return False
+        self.candles = deque(candles_from_arrays(state["candles"]))
+        for interval, aggregator in self.aggregators.items():
+            aggregator.set_state(state["aggregators"][interval])
+        return True
@@ -1,7 +1,12 @@
+import asyncio
+import itertools
+import logging
+from functools import wraps
 from pathlib import Path
-from typing import Optional
+from typing import List, Optional, Set
 
-from tinkoff.invest import AsyncClient, Client
+from grpc import StatusCode
+from tinkoff.invest import AioRequestError, AsyncClient, Client
 from tinkoff.invest.async_services import AsyncServices
 from tinkoff.invest.caching.market_data_cache.cache import MarketDataCache
 from tinkoff.invest.caching.market_data_cache.cache_settings import \
@@ -11,25 +16,155 @@ from tinkoff.invest.services import Services
 
 from app.config import settings
 
+logger = logging.getLogger(__name__)
+
+
+class Channel:
+    """An async gRPC channel that can be reopened after a connection loss.
+
+    `generation` is increased on every reopen, so concurrent requests that
+    failed on the same connection reopen it only once. The replaced connection
+    is closed after `grpc_close_grace_period` seconds, so requests still running
+    on it can finish, or when the channel is closed.
+    """
+
+    def __init__(self, token: str, target: str, options: list):
+        self.token = token
+        self.target = target
+        self.options = options
+        self.manager: Optional[AsyncClient] = None
+        self.services: Optional[AsyncServices] = None
+        self.generation = 0
+        self.lock = asyncio.Lock()
+        self.closing: Set[asyncio.Task] = set()
+        self.closed = asyncio.Event()
+
+    async def open(self):
+        self.manager = AsyncClient(
+            token=self.token,
+            target=self.target,
+            options=self.options,
+            app_name=settings.app_name,
+        )
+        self.services = await self.manager.__aenter__()
+
+    async def close(self):
+        self.closed.set()
+        await asyncio.gather(*self.closing, return_exceptions=True)
+        if self.manager is not None:
+            await self.manager.__aexit__(None, None, None)
+        self.manager = None
+        self.services = None
+
+    async def reopen(self, generation: int):
+        async with self.lock:
+            if generation != self.generation:
+                return
+            manager = self.manager
+            await self.open()
+            self.generation += 1
+        if manager is not None:
+            task = asyncio.create_task(self.close_later(manager))
+            self.closing.add(task)
+            task.add_done_callback(self.closing.discard)
+
+    async def close_later(self, manager: AsyncClient):
+        try:
+            await asyncio.wait_for(
+                self.closed.wait(), timeout=settings.grpc_close_grace_period
+            )
+        except asyncio.TimeoutError:
+            pass
+        await manager.__aexit__(None, None, None)
+
+
+def is_unavailable(error: AioRequestError) -> bool:
+    return error.code == StatusCode.UNAVAILABLE
+
+
+def is_retryable(error: AioRequestError, channel: Channel, generation: int) -> bool:
+    # Requests are cancelled when their channel is closed after a reopen.
+    return is_unavailable(error) or (
+        error.code == StatusCode.CANCELLED and channel.generation != generation
+    )
+
+
+def get_backoff(attempt: int) -> float:
+    return min(
+        settings.grpc_reconnect_delay * 2**attempt, settings.grpc_reconnect_max_delay
+    )
+
+
+def reconnecting(method):
+    """Runs a request on the next channel of the pool. If the channel is
+    unavailable or was reopened during the request, the request is retried
+    with backoff."""
+
+    @wraps(method)
+    async def wrapper(self: "TinkoffClient", *args, **kwargs):
+        for attempt in itertools.count():
+            channel = self.get_channel()
+            generation = channel.generation
+            try:
+                return await method(self, channel.services, *args, **kwargs)
+            except AioRequestError as e:
+                if (
+                    not is_retryable(e, channel, generation)
+                    or attempt >= settings.grpc_retries
+                ):
+                    raise
+                delay = get_backoff(attempt)
+                logger.warning(
+                    "Connection lost, retrying %s in %s s. error=%s",
+                    method.__name__,
+                    delay,
+                    e,
+                )
+                await channel.reopen(generation)
+                await asyncio.sleep(delay)
+
+    return wrapper
+
+
+def on_health_check_done(task: asyncio.Task):
+    if not task.cancelled() and task.exception() is not None:
+        logger.error("Channel health check stopped", exc_info=task.exception())
+
 
 class TinkoffClient:
     def __init__(self, token: str, sandbox: bool):
         self.token = token
         self.sandbox = sandbox
-        self.client: Optional[AsyncServices] = None
+        self.channels: List[Channel] = []
+        self.requests = itertools.count()
+        self.health_check_task: Optional[asyncio.Task] = None
+        self.sync_client_manager: Optional[Client] = None
         self.sync_client: Optional[Services] = None
         self.market_data_cache: Optional[MarketDataCache] = None
         if settings.sandbox:
             self.target = INVEST_GRPC_API_SANDBOX
         else:
             self.target = INVEST_GRPC_API
+        self.options = [
+            ("grpc.keepalive_time_ms", settings.grpc_keepalive_time * 1000),
+            ("grpc.keepalive_timeout_ms", settings.grpc_keepalive_timeout * 1000),
+        ]
 
     async def init(self):
-        self.client = await AsyncClient(
-            token=self.token, target=self.target, app_name=settings.app_name
-        ).__aenter__()
+        self.channels = [
+            Channel(self.token, self.target, self.options)
+            for _ in range(settings.grpc_channels)
+        ]
+        for channel in self.channels:
+            await channel.open()
+        if settings.grpc_health_check_interval:
+            self.health_check_task = asyncio.create_task(self.check_health())
+            self.health_check_task.add_done_callback(on_health_check_done)
         if settings.use_candle_history_cache:
-            self.sync_client = Client(token=self.token, target=self.target).__enter__()
+            self.sync_client_manager = Client(
+                token=self.token, target=self.target, options=self.options
+            )
+            self.sync_client = self.sync_client_manager.__enter__()
             self.market_data_cache = MarketDataCache(
                 settings=MarketDataCacheSettings(
                     base_cache_dir=Path("market_data_cache")
@@ -37,59 +172,128 @@ class TinkoffClient:
                 services=self.sync_client,
             )
 
-    async def get_orders(self, **kwargs):
+    async def close(self):
+        if self.health_check_task is not None:
+            self.health_check_task.cancel()
+            self.health_check_task = None
+        for channel in self.channels:
+            await channel.close()
+        self.channels = []
+        if self.sync_client_manager is not None:
+            self.sync_client_manager.__exit__(None, None, None)
+            self.sync_client_manager = None
+            self.sync_client = None
+            self.market_data_cache = None
+
+    def get_channel(self) -> Channel:
+        return self.channels[next(self.requests) % len(self.channels)]
+
+    async def check_health(self):
+        while True:
+            await asyncio.sleep(settings.grpc_health_check_interval)
+            await asyncio.gather(
+                *(
+                    self.check_channel(i, channel)
+                    for i, channel in enumerate(self.channels)
+                )
+            )
+
+    async def check_channel(self, index: int, channel: Channel):
+        generation = channel.generation
+        try:
+            await asyncio.wait_for(
+                channel.services.users.get_info(),
+                timeout=settings.grpc_health_check_timeout,
+            )
+        except AioRequestError as e:
+            if not is_unavailable(e):
+                logger.warning("Health check of channel %s failed. error=%s", index, e)
+                return
+        except asyncio.TimeoutError:
+            logger.warning("Health check of channel %s timed out", index)
+        except Exception:
+            logger.exception("Health check of channel %s failed", index)
+            return
+        else:
+            return
+        logger.warning("Channel %s is unavailable, reopening it", index)
+        await channel.reopen(generation)
+
+    @reconnecting
+    async def get_orders(self, client: AsyncServices, **kwargs):
         if self.sandbox:
-            return await self.client.sandbox.get_sandbox_orders(**kwargs)
-        return await self.client.orders.get_orders(**kwargs)
+            return await client.sandbox.get_sandbox_orders(**kwargs)
+        return await client.orders.get_orders(**kwargs)
 
-    async def get_portfolio(self, **kwargs):
+    @reconnecting
+    async def get_portfolio(self, client: AsyncServices, **kwargs):
         if self.sandbox:
-            return await self.client.sandbox.get_sandbox_portfolio(**kwargs)
-        return await self.client.operations.get_portfolio(**kwargs)
+            return await client.sandbox.get_sandbox_portfolio(**kwargs)
+        return await client.operations.get_portfolio(**kwargs)
 
-    async def get_accounts(self):
+    @reconnecting
+    async def get_accounts(self, client: AsyncServices):
         if self.sandbox:
-            return await self.client.sandbox.get_sandbox_accounts()
-        return await self.client.users.get_accounts()
+            return await client.sandbox.get_sandbox_accounts()
+        return await client.users.get_accounts()
 
     async def get_all_candles(self, **kwargs):
         if settings.use_candle_history_cache:
             for candle in self.market_data_cache.get_all_candles(**kwargs):
                 yield candle
-        else:
-            async for candle in self.client.get_all_candles(**kwargs):
+            return
+        # Candles are not retried here, the stream may have been partially
+        # consumed already. The channel is reopened for the next request.
+        channel = self.get_channel()
+        generation = channel.generation
+        try:
+            async for candle in channel.services.get_all_candles(**kwargs):
                 yield candle
+        except AioRequestError as e:
+            if is_unavailable(e):
+                await channel.reopen(generation)
+            raise
 
-    async def get_last_prices(self, **kwargs):
-        return await self.client.market_data.get_last_prices(**kwargs)
+    @reconnecting
+    async def get_last_prices(self, client: AsyncServices, **kwargs):
+        return await client.market_data.get_last_prices(**kwargs)
 
-    async def post_order(self, **kwargs):
+    @reconnecting
+    async def post_order(self, client: AsyncServices, **kwargs):
+        # Retrying is safe, orders with the same order_id are not duplicated.
         if self.sandbox:
-            return await self.client.sandbox.post_sandbox_order(**kwargs)
-        return await self.client.orders.post_order(**kwargs)
+            return await client.sandbox.post_sandbox_order(**kwargs)
+        return await client.orders.post_order(**kwargs)
 
-    async def get_order_state(self, **kwargs):
+    @reconnecting
+    async def get_order_state(self, client: AsyncServices, **kwargs):
         if self.sandbox:
-            return await self.client.sandbox.get_sandbox_order_state(**kwargs)
-        return await self.client.orders.get_order_state(**kwargs)
+            return await client.sandbox.get_sandbox_order_state(**kwargs)
+        return await client.orders.get_order_state(**kwargs)
 
-    async def get_trading_status(self, **kwargs):
-        return await self.client.market_data.get_trading_status(**kwargs)
+    @reconnecting
+    async def get_trading_status(self, client: AsyncServices, **kwargs):
+        return await client.market_data.get_trading_status(**kwargs)
 
-    async def get_instrument(self, **kwargs):
-        return await self.client.instruments.get_instrument_by(**kwargs)
+    @reconnecting
+    async def get_instrument(self, client: AsyncServices, **kwargs):
+        return await client.instruments.get_instrument_by(**kwargs)
 
-    async def get_all_shares(self, **kwargs):
-        return await self.client.instruments.shares(**kwargs)
+    @reconnecting
+    async def get_all_shares(self, client: AsyncServices, **kwargs):
+        return await client.instruments.shares(**kwargs)
 
-    async def get_ticker(self, **kwargs):
-        return (await self.client.instruments.share_by(**kwargs)).instrument.ticker
+    @reconnecting
+    async def get_ticker(self, client: AsyncServices, **kwargs):
+        return (await client.instruments.share_by(**kwargs)).instrument.ticker
 
-    async def sandbox_pay_in(self, **kwargs):
-        return await self.client.sandbox.sandbox_pay_in(**kwargs)
+    @reconnecting
+    async def sandbox_pay_in(self, client: AsyncServices, **kwargs):
+        return await client.sandbox.sandbox_pay_in(**kwargs)
 
-    async def get_sandbox_withdraw_limits(self, **kwargs):
-        return await self.client.sandbox.get_sandbox_withdraw_limits(**kwargs)
+    @reconnecting
+    async def get_sandbox_withdraw_limits(self, client: AsyncServices, **kwargs):
+        return await client.sandbox.get_sandbox_withdraw_limits(**kwargs)
 
 
 client = TinkoffClient(settings.token, settings.sandbox)
@@ -1,4 +1,5 @@
 import logging
+from typing import Optional
 
 from pydantic_settings import BaseSettings
 
@@ -9,7 +10,25 @@ class Settings(BaseSettings):
     account_id: str
     sandbox: bool
     use_candle_history_cache: bool = True
-    log_level: int = logging.DEBUG
+    grpc_channels: int = 2
+    grpc_keepalive_time: int = 60
+    grpc_keepalive_timeout: int = 20
+    grpc_retries: int = 5
+    grpc_reconnect_delay: float = 1
+    grpc_reconnect_max_delay: float = 30
+    grpc_health_check_interval: float = 60
+    grpc_health_check_timeout: float = 10
+    grpc_close_grace_period: float = 30
+    instruments_config_check_interval: int = 5
+    use_snapshots: bool = True
+    snapshot_dir: str = "snapshots"
+    snapshot_interval: int = 300
+    log_level: int = logging.INFO
+    log_format: str = "text"
+    log_file: Optional[str] = None
+    log_file_max_bytes: int = 10 * 1024 * 1024
+    log_file_backup_count: int = 5
+    log_sample_interval: int = 60
     tinkoff_library_log_level: int = logging.INFO
 
     class Config:
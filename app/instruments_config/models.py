@@ -1,17 +1,44 @@
 from typing import Any, Dict, List
 
-from pydantic import BaseModel
+from pydantic import BaseModel, ConfigDict, Field, model_validator
+
+from app.strategies.models import StrategyName
+from app.strategies.scalpel.models import ScalpelStrategyConfig
+
+strategy_configs: Dict[str, BaseModel.__class__] = {
+    StrategyName.SCALPEL.value: ScalpelStrategyConfig,
+}
 
 
 class StrategyConfig(BaseModel):
+    model_config = ConfigDict(extra="forbid")
+
     name: str
-    parameters: Dict[str, Any]
+    parameters: Dict[str, Any] = Field(default_factory=dict)
+
+    @model_validator(mode="after")
+    def check_parameters(self):
+        if self.name not in strategy_configs:
+            raise ValueError(f"Strategy {self.name} is not supported")
+        strategy_configs[self.name].model_validate(self.parameters)
+        return self
 
 
 class InstrumentConfig(BaseModel):
+    model_config = ConfigDict(extra="forbid")
+
     figi: str
     strategy: StrategyConfig
 
 
 class InstrumentsConfig(BaseModel):
-    instruments: List = List[InstrumentConfig]
+    model_config = ConfigDict(extra="forbid")
+
+    instruments: List[InstrumentConfig]
+
+    @model_validator(mode="after")
+    def check_duplicates(self):
+        keys = [(i.figi, i.strategy.name) for i in self.instruments]
+        if len(keys) != len(set(keys)):
+            raise ValueError("Each figi can be used only once per strategy")
+        return self
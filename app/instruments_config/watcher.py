@@ -0,0 +1,42 @@
+import asyncio
+import logging
+import os
+from typing import AsyncIterator, Optional, Tuple
+
+from pydantic import ValidationError
+
+from app.instruments_config.models import InstrumentsConfig
+from app.instruments_config.parser import get_instruments
+
+logger = logging.getLogger(__name__)
+
+
+class InstrumentsConfigWatcher:
+    def __init__(self, filename: str, interval: int):
+        self.filename = filename
+        self.interval = interval
+        self._stat = self._get_stat()
+
+    def _get_stat(self) -> Optional[Tuple[int, int]]:
+        try:
+            stat = os.stat(self.filename)
+        except FileNotFoundError:
+            return None
+        return stat.st_mtime_ns, stat.st_size
+
+    async def watch(self) -> AsyncIterator[InstrumentsConfig]:
+        while True:
+            await asyncio.sleep(self.interval)
+            stat = self._get_stat()
+            if stat is None or stat == self._stat:
+                continue
+            self._stat = stat
+            try:
+                config = get_instruments(self.filename)
+            except (OSError, ValidationError) as e:
+                logger.error(
+                    "Invalid instruments config, keeping the running one. error=%s", e
+                )
+                continue
+            logger.info("Instruments config %s changed", self.filename)
+            yield config
@@ -0,0 +1,114 @@
+import json
+import logging
+import queue
+import time
+from logging.handlers import QueueHandler, QueueListener, RotatingFileHandler
+from typing import Dict, Hashable, Optional, Tuple
+
+TEXT_FORMAT = "[%(levelname)-5s] %(asctime)-19s %(name)s:%(lineno)d: %(message)s"
+
+
+class TextFormatter(logging.Formatter):
+    def __init__(self):
+        super().__init__(TEXT_FORMAT)
+
+    def formatMessage(self, record: logging.LogRecord) -> str:
+        message = super().formatMessage(record)
+        suppressed = getattr(record, "suppressed", None)
+        if suppressed:
+            message += f" (suppressed={suppressed})"
+        return message
+
+
+class JsonFormatter(logging.Formatter):
+    def format(self, record: logging.LogRecord) -> str:
+        data = {
+            "time": self.formatTime(record),
+            "level": record.levelname,
+            "logger": record.name,
+            "line": record.lineno,
+            "message": record.getMessage(),
+        }
+        figi = getattr(record, "figi", None)
+        if figi is not None:
+            data["figi"] = figi
+        suppressed = getattr(record, "suppressed", None)
+        if suppressed:
+            data["suppressed"] = suppressed
+        if record.exc_info:
+            data["exc_info"] = self.formatException(record.exc_info)
+        return json.dumps(data, ensure_ascii=False, default=str)
+
+
+class FigiLoggerAdapter(logging.LoggerAdapter):
+    """Adds `figi` to every record of an instrument.
+
+    `sample` logs a repetitive message at most once per `sample_interval`
+    seconds for each message template and `key`, e.g. a timeframe the message
+    is about. Sampling is done before the record is created, and the number of
+    dropped messages is attached to the next one.
+    """
+
+    def __init__(self, logger: logging.Logger, figi: str, sample_interval: float = 0):
+        super().__init__(logger, {"figi": figi})
+        self.sample_interval = sample_interval
+        self._sampled: Dict[Tuple[str, Hashable], Tuple[float, int]] = {}
+
+    def sample(self, level: int, msg: str, *args, key: Hashable = None, **kwargs):
+        if not self.isEnabledFor(level):
+            return
+        suppressed = 0
+        if self.sample_interval:
+            now = time.monotonic()
+            sample_key = (msg, key)
+            last, suppressed = self._sampled.get(sample_key, (None, 0))
+            if last is not None and now - last < self.sample_interval:
+                self._sampled[sample_key] = (last, suppressed + 1)
+                return
+            self._sampled[sample_key] = (now, 0)
+        self.logger.log(
+            level,
+            msg,
+            *args,
+            extra={**self.extra, "suppressed": suppressed},
+            stacklevel=2,
+            **kwargs,
+        )
+
+
+class LazyQueueHandler(QueueHandler):
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        # The listener runs in the same process, so the message is formatted
+        # there instead of on the event loop.
+        return record
+
+
+def setup_logging(
+    level: int,
+    log_format: str = "text",
+    log_file: Optional[str] = None,
+    log_file_max_bytes: int = 10 * 1024 * 1024,
+    log_file_backup_count: int = 5,
+    stream_handler: Optional[logging.Handler] = None,
+) -> QueueListener:
+    formatter = JsonFormatter() if log_format == "json" else TextFormatter()
+    handlers = [stream_handler or logging.StreamHandler()]
+    if log_file:
+        handlers.append(
+            RotatingFileHandler(
+                log_file,
+                maxBytes=log_file_max_bytes,
+                backupCount=log_file_backup_count,
+                encoding="utf-8",
+            )
+        )
+    for handler in handlers:
+        handler.setFormatter(formatter)
+
+    log_queue = queue.SimpleQueue()
+    root = logging.getLogger()
+    for handler in root.handlers[:]:
+        root.removeHandler(handler)
+    root.addHandler(LazyQueueHandler(log_queue))
+    root.setLevel(level)
+    return QueueListener(log_queue, *handlers, respect_handler_level=True)
@@ -1,32 +1,49 @@
 import asyncio
 import logging
+import signal
 
 from app.client import client
 from app.config import settings
-from app.instruments_config.parser import instruments_config
-from app.strategies.strategy_fabric import resolve_strategy
+from app.instruments_config.parser import (get_instruments,
+                                           instruments_config_path)
+from app.instruments_config.watcher import InstrumentsConfigWatcher
+from app.logger import setup_logging
+from app.strategies.supervisor import StrategySupervisor
 
-logging.basicConfig(
+log_listener = setup_logging(
     level=settings.log_level,
-    format="[%(levelname)-5s] %(asctime)-19s %(name)s:%(lineno)d: %(message)s",
+    log_format=settings.log_format,
+    log_file=settings.log_file,
+    log_file_max_bytes=settings.log_file_max_bytes,
+    log_file_backup_count=settings.log_file_backup_count,
 )
 
 logging.getLogger("tinkoff.invest").setLevel(settings.tinkoff_library_log_level)
 
+instruments_config = get_instruments(instruments_config_path)
+
 
 async def run():
+    asyncio.get_running_loop().add_signal_handler(
+        signal.SIGTERM, asyncio.current_task().cancel
+    )
     await client.init()
-    spawned_tasks = []
-    for instrument_config in instruments_config.instruments:
-        strategy = resolve_strategy(
-            strategy_name=instrument_config["strategy"]["name"],
-            figi=instrument_config["figi"],
-            **instrument_config["strategy"]["parameters"]
+    try:
+        await StrategySupervisor().run(
+            instruments_config,
+            InstrumentsConfigWatcher(
+                instruments_config_path, settings.instruments_config_check_interval
+            ),
         )
-        spawned_tasks.append(asyncio.create_task(strategy.start()))
-
-    await asyncio.wait(spawned_tasks)
+    finally:
+        await client.close()
 
 
 if __name__ == "__main__":
-    asyncio.run(run())
+    log_listener.start()
+    try:
+        asyncio.run(run())
+    except asyncio.CancelledError:
+        logging.info("Stopped by SIGTERM")
+    finally:
+        log_listener.stop()
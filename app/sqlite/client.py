@@ -58,3 +58,8 @@ class SQLiteClient:
         cursor = self.conn.cursor()
         cursor.execute(sql, params)
         return cursor.fetchone()
+
+    def execute_script(self, sql):
+        cursor = self.conn.cursor()
+        cursor.executescript(sql)
+        self.conn.commit()
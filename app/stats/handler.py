@@ -2,8 +2,10 @@ import asyncio
 
 from tinkoff.invest import AioRequestError, OrderExecutionReportStatus
 from tinkoff.invest.grpc.instruments_pb2 import INSTRUMENT_ID_TYPE_FIGI
+from tinkoff.invest.schemas import OrderState
 
 from app.client import TinkoffClient
+from app.stats.models import ORDER_DIRECTION, ORDER_EXECUTION_REPORT_STATUS
 from app.stats.sqlite_client import StatsSQLiteClient
 from app.strategies.models import StrategyName
 from app.utils.quotation import quotation_to_float
@@ -13,19 +15,15 @@ FINAL_ORDER_STATUS = [
     OrderExecutionReportStatus.EXECUTION_REPORT_STATUS_CANCELLED,
     OrderExecutionReportStatus.EXECUTION_REPORT_STATUS_REJECTED,
 ]
-ORDER_DIRECTION = {
-    0: "Значение не указано",
-    1: "Покупка",
-    2: "Продажа",
-}
-ORDER_EXECUTION_REPORT_STATUS = {
-    0: "none",
-    1: "Исполнена",
-    2: "Отклонена",
-    3: "Отменена пользователем",
-    4: "Новая",
-    5: "Частично исполнена",
-}
+
+
+def get_execution_details(order_state: OrderState) -> dict:
+    return {
+        "executed_price": quotation_to_float(order_state.average_position_price),
+        "executed_amount": quotation_to_float(order_state.executed_order_price),
+        "executed_quantity": order_state.lots_executed,
+        "commission": quotation_to_float(order_state.executed_commission),
+    }
 
 
 class StatsHandler:
@@ -34,7 +32,7 @@ class StatsHandler:
         self.db = StatsSQLiteClient(db_name="stats.db")
         self.broker_client = broker_client
 
-    async def handle_new_order(self, account_id: str, order_id: str):
+    async def handle_new_order(self, account_id: str, order_id: str, lot: int = 1):
         try:
             order_state = await self.broker_client.get_order_state(
                 account_id=account_id, order_id=order_id
@@ -56,15 +54,18 @@ class StatsHandler:
             status=ORDER_EXECUTION_REPORT_STATUS.get(
                 order_state.execution_report_status
             ),
+            lot=lot,
+            **get_execution_details(order_state),
         )
         while order_state.execution_report_status not in FINAL_ORDER_STATUS:
             await asyncio.sleep(10)
             order_state = await self.broker_client.get_order_state(
                 account_id=account_id, order_id=order_id
             )
-        self.db.update_order_status(
+        self.db.update_order(
             order_id=order_id,
             status=ORDER_EXECUTION_REPORT_STATUS.get(
                 order_state.execution_report_status
             ),
+            **get_execution_details(order_state),
         )
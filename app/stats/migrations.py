@@ -0,0 +1,95 @@
+from app.stats.models import DIRECTION_BUY, DIRECTION_SELL
+
+
+def pnl_daily_delta(amount: str, quantity: str, commission: str, orders: str) -> str:
+    """Adds executed amount, quantity and commission of an order to pnl_daily.
+
+    The arguments are SQL expressions, so triggers can pass either the full
+    values of a new order or the difference between OLD and NEW rows.
+    """
+    return f"""
+    INSERT INTO pnl_daily (
+        day, figi, ticker, buy_amount, sell_amount,
+        buy_quantity, sell_quantity, commission, orders
+    )
+    VALUES (
+        date(NEW.updated_at),
+        NEW.figi,
+        NEW.ticker,
+        CASE WHEN NEW.direction = '{DIRECTION_BUY}' THEN {amount} ELSE 0 END,
+        CASE WHEN NEW.direction = '{DIRECTION_SELL}' THEN {amount} ELSE 0 END,
+        CASE WHEN NEW.direction = '{DIRECTION_BUY}' THEN {quantity} ELSE 0 END,
+        CASE WHEN NEW.direction = '{DIRECTION_SELL}' THEN {quantity} ELSE 0 END,
+        {commission},
+        {orders}
+    )
+    ON CONFLICT (figi, day) DO UPDATE SET
+        ticker = excluded.ticker,
+        buy_amount = buy_amount + excluded.buy_amount,
+        sell_amount = sell_amount + excluded.sell_amount,
+        buy_quantity = buy_quantity + excluded.buy_quantity,
+        sell_quantity = sell_quantity + excluded.sell_quantity,
+        commission = commission + excluded.commission,
+        orders = orders + excluded.orders;
+"""
+
+
+MIGRATIONS = [
+    [
+        """CREATE TABLE IF NOT EXISTS orders (
+            id TEXT PRIMARY KEY,
+            ticker TEXT,
+            figi TEXT,
+            direction TEXT,
+            price REAL,
+            quantity INTEGER,
+            status TEXT)""",
+    ],
+    [
+        "ALTER TABLE orders ADD COLUMN lot INTEGER NOT NULL DEFAULT 1",
+        "ALTER TABLE orders ADD COLUMN executed_price REAL",
+        "ALTER TABLE orders ADD COLUMN executed_amount REAL",
+        "ALTER TABLE orders ADD COLUMN executed_quantity INTEGER NOT NULL DEFAULT 0",
+        "ALTER TABLE orders ADD COLUMN commission REAL",
+        "ALTER TABLE orders ADD COLUMN created_at TEXT",
+        "ALTER TABLE orders ADD COLUMN updated_at TEXT",
+        "CREATE INDEX IF NOT EXISTS orders_figi ON orders (figi, created_at)",
+        "CREATE INDEX IF NOT EXISTS orders_status ON orders (status)",
+        "CREATE INDEX IF NOT EXISTS orders_created_at ON orders (created_at)",
+        """CREATE TABLE IF NOT EXISTS pnl_daily (
+            day TEXT NOT NULL,
+            figi TEXT NOT NULL,
+            ticker TEXT,
+            buy_amount REAL NOT NULL DEFAULT 0,
+            sell_amount REAL NOT NULL DEFAULT 0,
+            buy_quantity INTEGER NOT NULL DEFAULT 0,
+            sell_quantity INTEGER NOT NULL DEFAULT 0,
+            commission REAL NOT NULL DEFAULT 0,
+            orders INTEGER NOT NULL DEFAULT 0,
+            PRIMARY KEY (figi, day))""",
+        "CREATE INDEX IF NOT EXISTS pnl_daily_day ON pnl_daily (day)",
+        # Executions are aggregated as they grow, so partially filled orders
+        # that are cancelled later are counted too.
+        f"""CREATE TRIGGER IF NOT EXISTS orders_insert_pnl_daily
+            AFTER INSERT ON orders
+            WHEN NEW.executed_quantity > 0
+            BEGIN {pnl_daily_delta(
+                amount="COALESCE(NEW.executed_amount, 0)",
+                quantity="NEW.executed_quantity * NEW.lot",
+                commission="COALESCE(NEW.commission, 0)",
+                orders="1",
+            )} END""",
+        f"""CREATE TRIGGER IF NOT EXISTS orders_update_pnl_daily
+            AFTER UPDATE OF executed_quantity, executed_amount, commission ON orders
+            WHEN NEW.executed_quantity > OLD.executed_quantity
+                OR NEW.executed_amount IS NOT OLD.executed_amount
+                OR NEW.commission IS NOT OLD.commission
+            BEGIN {pnl_daily_delta(
+                amount="COALESCE(NEW.executed_amount, 0)"
+                " - COALESCE(OLD.executed_amount, 0)",
+                quantity="(NEW.executed_quantity - OLD.executed_quantity) * NEW.lot",
+                commission="COALESCE(NEW.commission, 0) - COALESCE(OLD.commission, 0)",
+                orders="OLD.executed_quantity = 0 AND NEW.executed_quantity > 0",
+            )} END""",
+    ],
+]
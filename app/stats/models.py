@@ -0,0 +1,15 @@
+ORDER_DIRECTION = {
+    0: "Значение не указано",
+    1: "Покупка",
+    2: "Продажа",
+}
+ORDER_EXECUTION_REPORT_STATUS = {
+    0: "none",
+    1: "Исполнена",
+    2: "Отклонена",
+    3: "Отменена пользователем",
+    4: "Новая",
+    5: "Частично исполнена",
+}
+DIRECTION_BUY = ORDER_DIRECTION[1]
+DIRECTION_SELL = ORDER_DIRECTION[2]
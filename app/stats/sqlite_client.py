@@ -1,23 +1,24 @@
+from typing import Optional
+
 from app.sqlite.client import SQLiteClient
+from app.stats.migrations import MIGRATIONS
 
 
 class StatsSQLiteClient:
     def __init__(self, db_name: str):
         self.db_client = SQLiteClient(db_name)
         self.db_client.connect()
-        self._create_tables()
-
-    def _create_tables(self):
-        self.db_client.execute(
-            """CREATE TABLE IF NOT EXISTS orders (
-                id TEXT PRIMARY KEY,
-                ticker TEXT,
-                figi TEXT,
-                direction TEXT,
-                price REAL,
-                quantity INTEGER,
-                status TEXT)"""
-        )
+        self.db_client.execute("PRAGMA journal_mode=WAL")
+        self._migrate()
+
+    def _migrate(self):
+        (version,) = self.db_client.execute_select_one("PRAGMA user_version")
+        for number, migration in enumerate(MIGRATIONS[version:], start=version + 1):
+            self.db_client.execute_script(
+                "BEGIN;\n"
+                + ";\n".join(migration)
+                + f";\nPRAGMA user_version = {number};\nCOMMIT;"
+            )
 
     def add_order(
         self,
@@ -28,16 +29,125 @@ class StatsSQLiteClient:
         price: float,
         quantity: int,
         status: str,
+        lot: int = 1,
+        executed_price: Optional[float] = None,
+        executed_amount: Optional[float] = None,
+        executed_quantity: int = 0,
+        commission: Optional[float] = None,
     ):
         self.db_client.execute_insert(
-            "INSERT INTO orders VALUES (?, ?, ?, ?, ?, ?, ?)",
-            (order_id, ticker, figi, order_direction, price, quantity, status),
+            """INSERT INTO orders (
+                id, ticker, figi, direction, price, quantity, status, lot,
+                executed_price, executed_amount, executed_quantity, commission,
+                created_at, updated_at
+            )
+            VALUES (
+                ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, datetime('now'), datetime('now')
+            )""",
+            (
+                order_id,
+                ticker,
+                figi,
+                order_direction,
+                price,
+                quantity,
+                status,
+                lot,
+                executed_price,
+                executed_amount,
+                executed_quantity,
+                commission,
+            ),
         )
 
     def get_order(self):
         return self.db_client.execute_select("SELECT * FROM orders")
 
+    def get_orders(
+        self,
+        figi: Optional[str] = None,
+        status: Optional[str] = None,
+        since: Optional[str] = None,
+    ):
+        conditions, params = [], []
+        if figi is not None:
+            conditions.append("figi = ?")
+            params.append(figi)
+        if status is not None:
+            conditions.append("status = ?")
+            params.append(status)
+        if since is not None:
+            conditions.append("created_at >= ?")
+            params.append(since)
+        where = f"WHERE {' AND '.join(conditions)}" if conditions else ""
+        return self.db_client.execute_select(
+            f"SELECT * FROM orders {where} ORDER BY created_at", params
+        )
+
     def update_order_status(self, order_id: str, status: str):
         self.db_client.execute_update(
-            "UPDATE orders SET status = ? WHERE id = ?", (status, order_id)
+            "UPDATE orders SET status = ?, updated_at = datetime('now') WHERE id = ?",
+            (status, order_id),
+        )
+
+    def update_order(
+        self,
+        order_id: str,
+        status: str,
+        executed_price: Optional[float],
+        executed_amount: Optional[float],
+        executed_quantity: int,
+        commission: Optional[float],
+    ):
+        self.db_client.execute_update(
+            """UPDATE orders SET
+                executed_price = ?,
+                executed_amount = ?,
+                executed_quantity = ?,
+                commission = ?,
+                status = ?,
+                updated_at = datetime('now')
+            WHERE id = ?""",
+            (
+                executed_price,
+                executed_amount,
+                executed_quantity,
+                commission,
+                status,
+                order_id,
+            ),
+        )
+
+    def get_pnl_by_ticker(self, since: str):
+        return self.db_client.execute_select(
+            """SELECT
+                ticker,
+                SUM(sell_amount - buy_amount - commission) AS pnl,
+                SUM(buy_amount),
+                SUM(sell_amount),
+                SUM(buy_quantity - sell_quantity),
+                SUM(commission),
+                SUM(orders)
+            FROM pnl_daily
+            WHERE day >= ?
+            GROUP BY figi
+            ORDER BY pnl DESC""",
+            (since,),
+        )
+
+    def get_pnl_by_day(self, since: str):
+        return self.db_client.execute_select(
+            """SELECT
+                day,
+                SUM(sell_amount - buy_amount - commission),
+                SUM(buy_amount),
+                SUM(sell_amount),
+                SUM(buy_quantity - sell_quantity),
+                SUM(commission),
+                SUM(orders)
+            FROM pnl_daily
+            WHERE day >= ?
+            GROUP BY day
+            ORDER BY day""",
+            (since,),
         )
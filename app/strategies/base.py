@@ -9,3 +9,7 @@ class BaseStrategy(ABC):
     @abstractmethod
     def start(self):
         pass
+
+    @abstractmethod
+    def reconfigure(self, *args, **kwargs):
+        pass
@@ -1,8 +1,30 @@
-from pydantic import BaseModel, Field
+from typing import List
+
+from pydantic import BaseModel, ConfigDict, Field, model_validator
+
+from app.candles.models import BASE_CANDLE_INTERVALS
 
 
 class ScalpelStrategyConfig(BaseModel):
-    days_back_to_consider: int = Field(1, g=0)
+    model_config = ConfigDict(extra="forbid")
+
+    days_back_to_consider: int = Field(1, gt=0)
     stop_loss_percent: float = Field(0.05, ge=0.0, le=1.0)
     quantity_limit: int = Field(1, ge=0)
-    check_data: int = Field(60, g=0)
+    check_data: int = Field(60, gt=0)
+    backcandles: int = Field(15, gt=0)
+    candle_interval: int = Field(5)
+    confirmation_intervals: List[int] = Field(default_factory=list)
+
+    @model_validator(mode="after")
+    def check_intervals(self):
+        if self.candle_interval not in BASE_CANDLE_INTERVALS:
+            raise ValueError(
+                f"candle_interval must be one of {list(BASE_CANDLE_INTERVALS)}"
+            )
+        for interval in self.confirmation_intervals:
+            if interval <= self.candle_interval or interval % self.candle_interval:
+                raise ValueError(
+                    f"confirmation interval {interval} must be a multiple of candle_interval"
+                )
+        return self
@@ -1,149 +1,138 @@
 import asyncio
-import datetime
 import logging
-from datetime import timedelta
+from datetime import datetime, timedelta
 from typing import Optional
 from uuid import uuid4
 
 from pandas import DataFrame
-from ta.momentum import RSIIndicator
-from ta.trend import EMAIndicator
-from ta.volatility import AverageTrueRange, BollingerBands
-from ta.volume import VolumeWeightedAveragePrice
-from tinkoff.invest import AioRequestError, CandleInterval, Instrument
+from tinkoff.invest import AioRequestError, Instrument
 from tinkoff.invest.grpc.instruments_pb2 import INSTRUMENT_ID_TYPE_FIGI
 from tinkoff.invest.grpc.orders_pb2 import (ORDER_DIRECTION_BUY,
                                             ORDER_DIRECTION_SELL,
                                             ORDER_TYPE_MARKET)
 from tinkoff.invest.utils import now
 
+from app.candles.models import BASE_CANDLE_INTERVALS
+from app.candles.store import CandleStore, candle_from_historic
 from app.client import client
 from app.config import settings
+from app.logger import FigiLoggerAdapter
 from app.stats.handler import StatsHandler
 from app.strategies.base import BaseStrategy
 from app.strategies.models import StrategyName
 from app.strategies.scalpel.models import ScalpelStrategyConfig
+from app.strategies.scalpel.signals import (add_ema_signal, add_indicators,
+                                            add_signal, add_trend)
+from app.strategies.snapshots import (get_snapshot_path, load_snapshot,
+                                      save_snapshot)
 from app.utils.portfolio import get_order, get_position
-from app.utils.quantity import is_quantity_valid
-from app.utils.quotation import quotation_to_float
+from app.utils.quantity import is_quantity_valid, quantity_to_lots
+from app.utils.quotation import quotation_to_float, quotation_to_nano
 
 logger = logging.getLogger(__name__)
 
 
 class ScalpelStrategy(BaseStrategy):
-    def __init__(self, figi: str = None, backcandles: int = 15, *args, **kwargs):
+    def __init__(self, figi: str = None, *args, **kwargs):
         self.account_id = settings.account_id
         self.figi = figi
         self.stats_handler = StatsHandler(StrategyName.SCALPEL, client)
         self.config: ScalpelStrategyConfig = ScalpelStrategyConfig(**kwargs)
-        self.backcandles = backcandles
         self.instrument_info: Optional[Instrument, None] = None
+        self.candles = CandleStore(
+            self.config.candle_interval, self.config.confirmation_intervals
+        )
+        self.snapshot_path = get_snapshot_path(StrategyName.SCALPEL.value, figi)
+        self.last_checkpoint = now()
+        self.logger = FigiLoggerAdapter(logger, figi, settings.log_sample_interval)
+
+    def reconfigure(self, *args, **kwargs):
+        config = ScalpelStrategyConfig(**kwargs)
+        if (
+            config.candle_interval != self.config.candle_interval
+            or config.confirmation_intervals != self.config.confirmation_intervals
+            or config.days_back_to_consider > self.config.days_back_to_consider
+        ):
+            self.candles = CandleStore(
+                config.candle_interval, config.confirmation_intervals
+            )
+        self.config = config
+        self.logger.info("New configuration for figi=%s: %s", self.figi, self.config)
+
+    def get_window_start(self) -> datetime:
+        return now() - timedelta(days=self.config.days_back_to_consider)
 
     async def get_historical_data(self):
-        candles = []
-        logger.info(
-            f"Start getting historical data for {self.config.days_back_to_consider} days back from now. "
-            f"figi={self.figi}"
+        from_ = self.get_window_start()
+        if self.candles.last is not None:
+            from_ = max(from_, self.candles.last.time)
+        self.logger.sample(
+            logging.INFO,
+            "Start getting historical data from %s. figi=%s",
+            from_,
+            self.figi,
         )
+        count = 0
         async for candle in client.get_all_candles(
             figi=self.figi,
-            from_=now() - timedelta(days=self.config.days_back_to_consider),
+            from_=from_,
             to=now(),
-            interval=CandleInterval.CANDLE_INTERVAL_5_MIN,
+            interval=BASE_CANDLE_INTERVALS[self.config.candle_interval],
         ):
-            candles.append(candle)
-        logger.info(f"Found {len(candles)} candles. figi={self.figi}")
-        return candles
+            self.candles.update(candle_from_historic(candle))
+            count += 1
+        self.candles.trim(self.get_window_start())
+        self.logger.sample(logging.INFO, "Found %s candles. figi=%s", count, self.figi)
 
     async def create_df(self):
-        candles = await self.get_historical_data()
-        if len(candles) == 0:
-            logger.debug(f"No candles found for {self.figi}")
+        await self.get_historical_data()
+        if self.candles.last is None:
+            self.logger.debug("No candles found for %s", self.figi)
             return
-        df = DataFrame(
-            [
-                {
-                    "Time": i.time,
-                    "Open": quotation_to_float(i.open),
-                    "High": quotation_to_float(i.high),
-                    "Low": quotation_to_float(i.low),
-                    "Close": quotation_to_float(i.close),
-                    "Volume": i.volume,
-                }
-                for i in candles
-            ]
-        )
-        df = df[df.High != df.Low]
-        logger.info(f"DataFrame created for {self.figi}")
+        df = self.candles.to_df()
+        self.logger.sample(logging.INFO, "DataFrame created for %s", self.figi)
         return df
 
     async def add_indicators(self):
-        df = await self.create_df()
-        bbands = BollingerBands(close=df["Close"], window=14, window_dev=2)
-        df = df.join(
-            [
-                bbands.bollinger_hband_indicator(),
-                bbands.bollinger_lband_indicator(),
-            ]
-        )
-        df["VWAP"] = VolumeWeightedAveragePrice(
-            high=df["High"],
-            low=df["Low"],
-            close=df["Close"],
-            volume=df["Volume"],
-            window=7,
-        ).volume_weighted_average_price()
-        df["RSI"] = RSIIndicator(close=df["Close"], window=16).rsi()
-        df["ATR"] = AverageTrueRange(
-            high=df["High"],
-            low=df["Low"],
-            close=df["Close"],
-            window=16,
-        ).average_true_range()
-        df["EMA_slow"] = EMAIndicator(close=df["Close"], window=50).ema_indicator()
-        df["EMA_fast"] = EMAIndicator(close=df["Close"], window=30).ema_indicator()
-        return df
+        return add_indicators(await self.create_df())
 
     async def add_signal(self, df: DataFrame):
-        above = df["EMA_fast"] > df["EMA_slow"]
-        below = df["EMA_fast"] < df["EMA_slow"]
-        above_all = (
-            above.rolling(window=self.backcandles)
-            .apply(lambda x: x.all(), raw=True)
-            .fillna(0)
-            .astype(bool)
-        )
-        below_all = (
-            below.rolling(window=self.backcandles)
-            .apply(lambda x: x.all(), raw=True)
-            .fillna(0)
-            .astype(bool)
-        )
-        df["EMASignal"] = 0
-        df.loc[above_all, "EMASignal"] = 2
-        df.loc[below_all, "EMASignal"] = 1
-        condition_buy = (df["EMASignal"] == 2) & (df["bbilband"])
-        condition_sell = (df["EMASignal"] == 1) & (df["bbihband"])
-        df["TotalSignal"] = 0
-        df.loc[condition_buy, "TotalSignal"] = 2
-        df.loc[condition_sell, "TotalSignal"] = 1
-        return df
+        return add_signal(df, self.config.backcandles)
+
+    def is_signal_confirmed(self, signal: int) -> bool:
+        for interval in self.config.confirmation_intervals:
+            df = add_ema_signal(
+                add_trend(self.candles.to_df(interval)), self.config.backcandles
+            )
+            if df.empty or df.EMASignal.iloc[-1] != signal:
+                self.logger.sample(
+                    logging.INFO,
+                    "Signal is not confirmed on %s min candles. figi=%s",
+                    interval,
+                    self.figi,
+                    key=interval,
+                )
+                return False
+        return True
 
     async def get_position_quantity(self):
         positions = (await client.get_portfolio(account_id=self.account_id)).positions
         position = get_position(positions, self.figi)
         if position is None:
             return 0
-        return int(quotation_to_float(position.quantity))
+        return position.quantity.units
 
     async def sell_order(self, last_price: float):
         position_quantity = await self.get_position_quantity()
         if position_quantity > 0:
-            logger.info(
-                f"Selling {position_quantity} shares. Last price={last_price} figi={self.figi}"
+            self.logger.info(
+                "Selling %s shares. Last price=%s figi=%s",
+                position_quantity,
+                last_price,
+                self.figi,
             )
             try:
-                quantity = position_quantity / self.instrument_info.lot
+                quantity = quantity_to_lots(position_quantity, self.instrument_info.lot)
                 if not is_quantity_valid(quantity):
                     raise ValueError(
                         f"Invalid quantity for posting an order. quantity={quantity}"
@@ -151,17 +140,21 @@ class ScalpelStrategy(BaseStrategy):
                 posted_order = await client.post_order(
                     order_id=str(uuid4()),
                     direction=ORDER_DIRECTION_SELL,
-                    quantity=int(quantity),
+                    quantity=quantity,
                     order_type=ORDER_TYPE_MARKET,
                     account_id=self.account_id,
                     instrument_id=self.figi,
                 )
             except Exception as e:
-                logger.error(f"Failed to post sell order. figi={self.figi}. error={e}")
+                self.logger.error(
+                    "Failed to post sell order. figi=%s. error=%s", self.figi, e
+                )
                 return
             await asyncio.create_task(
                 self.stats_handler.handle_new_order(
-                    order_id=posted_order.order_id, account_id=self.account_id
+                    order_id=posted_order.order_id,
+                    account_id=self.account_id,
+                    lot=self.instrument_info.lot,
                 )
             )
 
@@ -169,11 +162,14 @@ class ScalpelStrategy(BaseStrategy):
         position_quantity = await self.get_position_quantity()
         if position_quantity < self.config.quantity_limit:
             quantity_to_by = self.config.quantity_limit - position_quantity
-            logger.info(
-                f"Buying {quantity_to_by} shares. Last price={last_price} figi={self.figi}"
+            self.logger.info(
+                "Buying %s shares. Last price=%s figi=%s",
+                quantity_to_by,
+                last_price,
+                self.figi,
             )
             try:
-                quantity = quantity_to_by / self.instrument_info.lot
+                quantity = quantity_to_lots(quantity_to_by, self.instrument_info.lot)
                 if not is_quantity_valid(quantity):
                     raise ValueError(
                         f"Invalid quantity for posting an order. quantity={quantity}"
@@ -181,17 +177,21 @@ class ScalpelStrategy(BaseStrategy):
                 posted_order = await client.post_order(
                     order_id=str(uuid4()),
                     direction=ORDER_DIRECTION_BUY,
-                    quantity=int(quantity),
+                    quantity=quantity,
                     order_type=ORDER_TYPE_MARKET,
                     account_id=self.account_id,
                     instrument_id=self.figi,
                 )
             except Exception as e:
-                logger.error(f"Failed to post buy order. figi={self.figi}. error={e}")
+                self.logger.error(
+                    "Failed to post buy order. figi=%s. error=%s", self.figi, e
+                )
                 return
             await asyncio.create_task(
                 self.stats_handler.handle_new_order(
-                    order_id=posted_order.order_id, account_id=self.account_id
+                    order_id=posted_order.order_id,
+                    account_id=self.account_id,
+                    lot=self.instrument_info.lot,
                 )
             )
 
@@ -203,20 +203,19 @@ class ScalpelStrategy(BaseStrategy):
     async def validate_stop_loss(self, last_price: float):
         positions = (await client.get_portfolio(account_id=self.account_id)).positions
         position = get_position(positions, self.figi)
-        if position is None or quotation_to_float(position.quantity) == 0:
+        if position is None or quotation_to_nano(position.quantity) == 0:
             return
         position_price = quotation_to_float(position.average_position_price)
         if (
             last_price
             <= position_price - position_price * self.config.stop_loss_percent
         ):
-            logger.info(
-                f"Stop loss triggered. Last price={last_price} figi={self.figi}"
+            self.logger.info(
+                "Stop loss triggered. Last price=%s figi=%s", last_price, self.figi
             )
             try:
-                quantity = (
-                    int(quotation_to_float(position.quantity))
-                    / self.instrument_info.lot
+                quantity = quantity_to_lots(
+                    position.quantity.units, self.instrument_info.lot
                 )
                 if not is_quantity_valid(quantity):
                     raise ValueError(
@@ -225,16 +224,20 @@ class ScalpelStrategy(BaseStrategy):
                 posted_order = await client.post_order(
                     order_id=str(uuid4()),
                     direction=ORDER_DIRECTION_SELL,
-                    quantity=int(quantity),
+                    quantity=quantity,
                     order_type=ORDER_TYPE_MARKET,
                     account_id=self.account_id,
                 )
             except Exception as e:
-                logger.error(f"Failed to post sell order. figi={self.figi}. error={e}")
+                self.logger.error(
+                    "Failed to post sell order. figi=%s. error=%s", self.figi, e
+                )
                 return
             await asyncio.create_task(
                 self.stats_handler.handle_new_order(
-                    order_id=posted_order.order_id, account_id=self.account_id
+                    order_id=posted_order.order_id,
+                    account_id=self.account_id,
+                    lot=self.instrument_info.lot,
                 )
             )
         return
@@ -245,51 +248,110 @@ class ScalpelStrategy(BaseStrategy):
             trading_status.market_order_available_flag
             and trading_status.limit_order_available_flag
         ):
-            logger.debug(
-                f"Waiting for market to open. figi={self.figi}. time={datetime.datetime.now()}"
+            self.logger.sample(
+                logging.DEBUG, "Waiting for market to open. figi=%s", self.figi
             )
             await asyncio.sleep(60)
             trading_status = await client.get_trading_status(instrument_id=self.figi)
 
+    def get_snapshot(self) -> dict:
+        return {
+            "saved_at": now(),
+            "instrument_info": self.instrument_info,
+            "candles_since": self.get_window_start(),
+            "candles": self.candles.get_state(),
+        }
+
+    def restore_snapshot(self):
+        snapshot = load_snapshot(self.snapshot_path)
+        if snapshot is None:
+            return
+        if now() - snapshot["saved_at"] < timedelta(days=1):
+            self.instrument_info = snapshot["instrument_info"]
+        # The candles of a snapshot saved with a shorter days_back_to_consider
+        # are not restored, the history before them would never be loaded.
+        if snapshot["candles_since"] > self.get_window_start():
+            self.logger.info(
+                "Snapshot saved at %s does not cover %s days, ignoring its candles. "
+                "figi=%s",
+                snapshot["saved_at"],
+                self.config.days_back_to_consider,
+                self.figi,
+            )
+        elif self.candles.set_state(snapshot["candles"]):
+            self.logger.info(
+                "Restored %s candles from snapshot saved at %s. figi=%s",
+                len(self.candles.candles),
+                snapshot["saved_at"],
+                self.figi,
+            )
+
+    async def checkpoint(self):
+        if not settings.use_snapshots:
+            return
+        if now() - self.last_checkpoint < timedelta(seconds=settings.snapshot_interval):
+            return
+        self.last_checkpoint = now()
+        await asyncio.to_thread(save_snapshot, self.snapshot_path, self.get_snapshot())
+
     async def prepare_data(self):
-        self.instrument_info = (
-            await client.get_instrument(id_type=INSTRUMENT_ID_TYPE_FIGI, id=self.figi)
-        ).instrument
+        if settings.use_snapshots:
+            self.restore_snapshot()
+        if self.instrument_info is None:
+            self.instrument_info = (
+                await client.get_instrument(
+                    id_type=INSTRUMENT_ID_TYPE_FIGI, id=self.figi
+                )
+            ).instrument
 
     async def main_cycle(self):
         await self.prepare_data()
-        logger.info(
-            f"Starting scalpel strategy for figi={self.figi}"
-            f"({self.instrument_info.name} {self.instrument_info.currency}) lot size is {self.instrument_info.lot}."
-            f"Configuration is : {self.config}"
+        self.logger.info(
+            "Starting scalpel strategy for figi=%s (%s %s) lot size is %s. "
+            "Configuration is : %s",
+            self.figi,
+            self.instrument_info.name,
+            self.instrument_info.currency,
+            self.instrument_info.lot,
+            self.config,
         )
         while True:
             try:
                 await self.ensure_market_open()
                 df = await self.add_signal(await self.add_indicators())
+                await self.checkpoint()
                 orders = await client.get_orders(account_id=self.account_id)
                 if get_order(orders=orders.orders, figi=self.figi):
-                    logger.info(
-                        f"There are orders in progress. Waiting. figi={self.figi}"
+                    self.logger.sample(
+                        logging.INFO,
+                        "There are orders in progress. Waiting. figi=%s",
+                        self.figi,
                     )
                     continue
                 last_price = await self.get_last_price()
-                logger.debug(f"Last price: {last_price}, figi={self.figi}")
+                self.logger.debug("Last price: %s, figi=%s", last_price, self.figi)
                 await self.validate_stop_loss(last_price)
-                if df.TotalSignal.iloc[-1] == 2:
-                    logger.info(
-                        f"Triggered buy order for figi={self.figi}. Last price={last_price}"
+                signal = df.TotalSignal.iloc[-1]
+                if signal and not self.is_signal_confirmed(signal):
+                    signal = 0
+                if signal == 2:
+                    self.logger.info(
+                        "Triggered buy order for figi=%s. Last price=%s",
+                        self.figi,
+                        last_price,
                     )
                     await self.buy_order(last_price)
-                elif df.TotalSignal.iloc[-1] == 1:
-                    logger.info(
-                        f"Triggered sell order for figi={self.figi}. Last price={last_price}"
+                elif signal == 1:
+                    self.logger.info(
+                        "Triggered sell order for figi=%s. Last price=%s",
+                        self.figi,
+                        last_price,
                     )
                     await self.sell_order(last_price)
                 else:
-                    logger.info(f"No signal. figi={self.figi}")
+                    self.logger.sample(logging.INFO, "No signal. figi=%s", self.figi)
             except AioRequestError as er:
-                logger.error(f"Error in main cycle. Stopping strategy. {er}")
+                self.logger.error("Error in main cycle. Stopping strategy. %s", er)
             await asyncio.sleep(self.config.check_data)
 
     async def start(self):
@@ -297,6 +359,10 @@ class ScalpelStrategy(BaseStrategy):
             try:
                 self.account_id = (await client.get_accounts()).accounts.pop().id
             except AioRequestError as er:
-                logger.error(f"Error taking account id. Stopping strategy. {er}")
+                self.logger.error("Error taking account id. Stopping strategy. %s", er)
                 return
-        await self.main_cycle()
+        try:
+            await self.main_cycle()
+        finally:
+            if settings.use_snapshots and self.instrument_info is not None:
+                save_snapshot(self.snapshot_path, self.get_snapshot())
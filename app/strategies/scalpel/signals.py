@@ -0,0 +1,67 @@
+from pandas import DataFrame
+from ta.momentum import RSIIndicator
+from ta.trend import EMAIndicator
+from ta.volatility import AverageTrueRange, BollingerBands
+from ta.volume import VolumeWeightedAveragePrice
+
+
+def add_indicators(df: DataFrame) -> DataFrame:
+    bbands = BollingerBands(close=df["Close"], window=14, window_dev=2)
+    df = df.join(
+        [
+            bbands.bollinger_hband_indicator(),
+            bbands.bollinger_lband_indicator(),
+        ]
+    )
+    df["VWAP"] = VolumeWeightedAveragePrice(
+        high=df["High"],
+        low=df["Low"],
+        close=df["Close"],
+        volume=df["Volume"],
+        window=7,
+    ).volume_weighted_average_price()
+    df["RSI"] = RSIIndicator(close=df["Close"], window=16).rsi()
+    df["ATR"] = AverageTrueRange(
+        high=df["High"],
+        low=df["Low"],
+        close=df["Close"],
+        window=16,
+    ).average_true_range()
+    return add_trend(df)
+
+
+def add_trend(df: DataFrame) -> DataFrame:
+    df["EMA_slow"] = EMAIndicator(close=df["Close"], window=50).ema_indicator()
+    df["EMA_fast"] = EMAIndicator(close=df["Close"], window=30).ema_indicator()
+    return df
+
+
+def add_ema_signal(df: DataFrame, backcandles: int) -> DataFrame:
+    above = df["EMA_fast"] > df["EMA_slow"]
+    below = df["EMA_fast"] < df["EMA_slow"]
+    above_all = (
+        above.rolling(window=backcandles)
+        .apply(lambda x: x.all(), raw=True)
+        .fillna(0)
+        .astype(bool)
+    )
+    below_all = (
+        below.rolling(window=backcandles)
+        .apply(lambda x: x.all(), raw=True)
+        .fillna(0)
+        .astype(bool)
+    )
+    df["EMASignal"] = 0
+    df.loc[above_all, "EMASignal"] = 2
+    df.loc[below_all, "EMASignal"] = 1
+    return df
+
+
+def add_signal(df: DataFrame, backcandles: int) -> DataFrame:
+    df = add_ema_signal(df, backcandles)
+    condition_buy = (df["EMASignal"] == 2) & (df["bbilband"])
+    condition_sell = (df["EMASignal"] == 1) & (df["bbihband"])
+    df["TotalSignal"] = 0
+    df.loc[condition_buy, "TotalSignal"] = 2
+    df.loc[condition_sell, "TotalSignal"] = 1
+    return df
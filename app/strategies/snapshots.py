@@ -0,0 +1,42 @@
+import logging
+import os
+import pickle
+from pathlib import Path
+from typing import Optional
+
+from app.config import settings
+
+SNAPSHOT_VERSION = 2
+
+logger = logging.getLogger(__name__)
+
+
+def get_snapshot_path(strategy_name: str, figi: str) -> Path:
+    return Path(settings.snapshot_dir, f"{strategy_name}_{figi}.pickle")
+
+
+def save_snapshot(path: Path, snapshot: dict):
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp_path = path.with_suffix(".tmp")
+    with open(tmp_path, "wb") as f:
+        pickle.dump(
+            {"version": SNAPSHOT_VERSION, **snapshot},
+            f,
+            protocol=pickle.HIGHEST_PROTOCOL,
+        )
+    os.replace(tmp_path, path)
+
+
+def load_snapshot(path: Path) -> Optional[dict]:
+    if not path.exists():
+        return None
+    try:
+        with open(path, "rb") as f:
+            snapshot = pickle.load(f)
+    except Exception as e:
+        logger.error("Failed to load snapshot %s. error=%s", path, e)
+        return None
+    if snapshot.get("version") != SNAPSHOT_VERSION:
+        logger.info("Snapshot %s has an outdated version, ignoring it", path)
+        return None
+    return snapshot
@@ -0,0 +1,66 @@
+import asyncio
+import logging
+from typing import Dict, Tuple
+
+from app.instruments_config.models import InstrumentConfig, InstrumentsConfig
+from app.instruments_config.watcher import InstrumentsConfigWatcher
+from app.strategies.base import BaseStrategy
+from app.strategies.strategy_fabric import resolve_strategy
+
+logger = logging.getLogger(__name__)
+
+
+class StrategySupervisor:
+    def __init__(self):
+        self.configs: Dict[Tuple[str, str], InstrumentConfig] = {}
+        self.strategies: Dict[Tuple[str, str], BaseStrategy] = {}
+        self.tasks: Dict[Tuple[str, str], asyncio.Task] = {}
+
+    def start_strategy(self, key: Tuple[str, str], instrument_config: InstrumentConfig):
+        strategy = resolve_strategy(
+            strategy_name=instrument_config.strategy.name,
+            figi=instrument_config.figi,
+            **instrument_config.strategy.parameters,
+        )
+        self.configs[key] = instrument_config
+        self.strategies[key] = strategy
+        self.tasks[key] = asyncio.create_task(strategy.start())
+        logger.info("Started %s strategy. figi=%s", key[1], key[0])
+
+    def stop_strategy(self, key: Tuple[str, str]):
+        self.tasks.pop(key).cancel()
+        del self.strategies[key]
+        del self.configs[key]
+        logger.info("Stopped %s strategy. figi=%s", key[1], key[0])
+
+    async def stop(self):
+        tasks = list(self.tasks.values())
+        for key in list(self.tasks):
+            self.stop_strategy(key)
+        await asyncio.gather(*tasks, return_exceptions=True)
+
+    def apply(self, instruments_config: InstrumentsConfig):
+        configs = {(i.figi, i.strategy.name): i for i in instruments_config.instruments}
+        for key in self.tasks.keys() - configs.keys():
+            self.stop_strategy(key)
+        for key, instrument_config in configs.items():
+            if key not in self.tasks:
+                self.start_strategy(key, instrument_config)
+            elif instrument_config != self.configs[key]:
+                self.strategies[key].reconfigure(
+                    **instrument_config.strategy.parameters
+                )
+                self.configs[key] = instrument_config
+                logger.info("Reconfigured %s strategy. figi=%s", key[1], key[0])
+
+    async def run(
+        self,
+        instruments_config: InstrumentsConfig,
+        watcher: InstrumentsConfigWatcher,
+    ):
+        try:
+            self.apply(instruments_config)
+            async for new_config in watcher.watch():
+                self.apply(new_config)
+        finally:
+            await self.stop()
@@ -1,6 +1,7 @@
-from typing import Union
+def quantity_to_lots(quantity: int, lot: int) -> int:
+    """Returns the number of whole lots in `quantity` instruments."""
+    return quantity // lot
 
 
-def is_quantity_valid(quantity: Union[int, float]) -> bool:
-    if isinstance(quantity, (int, float)):
-        return quantity.is_integer() and quantity > 0
+def is_quantity_valid(quantity: int) -> bool:
+    return isinstance(quantity, int) and quantity > 0
@@ -1,12 +1,29 @@
-import math
+from decimal import Decimal
 from typing import Union
 
 from tinkoff.invest import MoneyValue, Quotation
 
+NANO = 1_000_000_000
+
+
+def quotation_to_nano(quotation: Union[Quotation, MoneyValue]) -> int:
+    return quotation.units * NANO + quotation.nano
+
+
+def nano_to_quotation(value: int) -> Quotation:
+    units, nano = divmod(abs(value), NANO)
+    if value < 0:
+        return Quotation(units=-units, nano=-nano)
+    return Quotation(units=units, nano=nano)
+
+
+def float_to_nano(value: float) -> int:
+    return int(Decimal(repr(value)).scaleb(9).to_integral_value())
+
 
 def quotation_to_float(quotation: Union[Quotation, MoneyValue]) -> float:
-    return float(quotation.units + quotation.nano / 1e9)
+    return quotation_to_nano(quotation) / NANO
 
 
 def float_to_quotation(value: float) -> Quotation:
-    return Quotation(*math.modf(value))
+    return nano_to_quotation(float_to_nano(value))
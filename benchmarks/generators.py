@@ -0,0 +1,56 @@
+from datetime import timezone
+from typing import List
+
+import numpy as np
+import pandas as pd
+from pandas import DataFrame
+from tinkoff.invest import HistoricCandle, Quotation
+
+BARS_PER_DAY = 168
+BAR_INTERVAL = pd.Timedelta(minutes=5)
+SESSION_START = pd.Timedelta(hours=7)
+PERIODS = {"1d": 1, "1m": 21, "1y": 252, "5y": 1260}
+INSTRUMENTS = [1, 10, 100, 500]
+BACKCANDLES = 15
+ROUNDS = 3
+
+
+def generate_ohlcv(days: int, seed: int = 0) -> DataFrame:
+    rng = np.random.default_rng(seed)
+    bars = days * BARS_PER_DAY
+    close = 100 * np.exp(np.cumsum(rng.normal(0, 0.002, bars)))
+    open_ = np.concatenate(([100.0], close[:-1]))
+    spread = np.abs(rng.normal(0, 0.001, bars)) * close
+    sessions = pd.bdate_range("2019-01-01", periods=days).repeat(BARS_PER_DAY)
+    offsets = np.tile(np.arange(BARS_PER_DAY) * BAR_INTERVAL, days)
+    return DataFrame(
+        {
+            "Open": open_.round(2),
+            "High": (np.maximum(open_, close) + spread).round(2),
+            "Low": (np.minimum(open_, close) - spread).round(2),
+            "Close": close.round(2),
+            "Volume": rng.integers(1, 10_000, bars),
+        },
+        index=pd.DatetimeIndex(sessions + SESSION_START + offsets, name="Time"),
+    )
+
+
+def to_quotation(value: float) -> Quotation:
+    units = int(value)
+    return Quotation(units=units, nano=round((value - units) * 1e9))
+
+
+def generate_candles(days: int, seed: int = 0) -> List[HistoricCandle]:
+    df = generate_ohlcv(days, seed)
+    return [
+        HistoricCandle(
+            open=to_quotation(row.Open),
+            high=to_quotation(row.High),
+            low=to_quotation(row.Low),
+            close=to_quotation(row.Close),
+            volume=int(row.Volume),
+            time=row.Index.tz_localize(timezone.utc).to_pydatetime(),
+            is_complete=True,
+        )
+        for row in df.itertuples()
+    ]
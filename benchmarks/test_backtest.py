@@ -0,0 +1,20 @@
+import pytest
+from backtesting import Backtest
+from generators import BACKCANDLES, PERIODS, ROUNDS, generate_ohlcv
+
+from app.backtest.simulator import run_backtest
+from app.backtest.strategy import ScalpelBacktestStrategy
+from app.strategies.scalpel.signals import add_indicators, add_signal
+
+
+@pytest.mark.parametrize("period", PERIODS)
+def test_backtest(benchmark, period):
+    df = add_signal(add_indicators(generate_ohlcv(PERIODS[period])), BACKCANDLES)
+    bt = Backtest(df, ScalpelBacktestStrategy, cash=100_000)
+    benchmark.pedantic(bt.run, rounds=ROUNDS)
+
+
+@pytest.mark.parametrize("period", PERIODS)
+def test_simulator(benchmark, period):
+    df = add_signal(add_indicators(generate_ohlcv(PERIODS[period])), BACKCANDLES)
+    benchmark.pedantic(run_backtest, args=(df,), rounds=ROUNDS)
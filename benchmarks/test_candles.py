@@ -0,0 +1,26 @@
+import pytest
+from generators import PERIODS, ROUNDS, generate_candles
+
+from app.candles.store import CandleStore, candle_from_historic
+
+CONFIRMATION_INTERVALS = [15, 60, 1440]
+
+
+@pytest.mark.parametrize("period", PERIODS)
+def test_candle_store_update(benchmark, period):
+    candles = [candle_from_historic(i) for i in generate_candles(PERIODS[period])]
+
+    def run():
+        store = CandleStore(5, CONFIRMATION_INTERVALS)
+        for candle in candles:
+            store.update(candle)
+
+    benchmark.pedantic(run, rounds=ROUNDS)
+
+
+@pytest.mark.parametrize("period", PERIODS)
+def test_candle_from_historic(benchmark, period):
+    candles = generate_candles(PERIODS[period])
+    benchmark.pedantic(
+        lambda: [candle_from_historic(i) for i in candles], rounds=ROUNDS
+    )
@@ -0,0 +1,57 @@
+import logging
+import os
+
+import pytest
+from generators import INSTRUMENTS
+
+from app.logger import FigiLoggerAdapter, TextFormatter, setup_logging
+
+logger = logging.getLogger("benchmark")
+
+
+@pytest.fixture(params=["sync", "queue", "queue_sampled"])
+def sample_interval(request):
+    """Configures the root logger writing to /dev/null and returns the sample
+    interval for the strategy loggers."""
+    root = logging.getLogger()
+    handlers, level = root.handlers[:], root.level
+    devnull = open(os.devnull, "w")
+    listener = None
+    if request.param == "sync":
+        handler = logging.StreamHandler(devnull)
+        handler.setFormatter(TextFormatter())
+        root.handlers = [handler]
+        root.setLevel(logging.INFO)
+    else:
+        listener = setup_logging(
+            level=logging.INFO, stream_handler=logging.StreamHandler(devnull)
+        )
+        listener.start()
+    yield 60 if request.param == "queue_sampled" else 0
+    if listener is not None:
+        listener.stop()
+    root.handlers = handlers
+    root.setLevel(level)
+    devnull.close()
+
+
+@pytest.mark.parametrize("instruments", INSTRUMENTS)
+def test_logging_cycle(benchmark, sample_interval, instruments):
+    """Logs of one main cycle without a signal for every instrument."""
+    adapters = [
+        FigiLoggerAdapter(logger, f"FIGI{i:08d}", sample_interval)
+        for i in range(instruments)
+    ]
+
+    def run():
+        for adapter in adapters:
+            figi = adapter.extra["figi"]
+            adapter.sample(
+                logging.INFO, "Start getting historical data from %s. figi=%s", 0, figi
+            )
+            adapter.sample(logging.INFO, "Found %s candles. figi=%s", 1, figi)
+            adapter.sample(logging.INFO, "DataFrame created for %s", figi)
+            adapter.debug("Last price: %s, figi=%s", 123.45, figi)
+            adapter.sample(logging.INFO, "No signal. figi=%s", figi)
+
+    benchmark(run)
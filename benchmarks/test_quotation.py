@@ -0,0 +1,26 @@
+import pytest
+from generators import INSTRUMENTS, PERIODS, generate_candles, to_quotation
+
+from app.utils.quotation import quotation_to_float
+
+
+def test_quotation_to_float(benchmark):
+    benchmark(quotation_to_float, to_quotation(123.45))
+
+
+@pytest.mark.parametrize("instruments", INSTRUMENTS)
+def test_quotation_to_float_instruments(benchmark, instruments):
+    candles = [
+        candle
+        for seed in range(instruments)
+        for candle in generate_candles(PERIODS["1d"], seed)
+    ]
+
+    def run():
+        for candle in candles:
+            quotation_to_float(candle.open)
+            quotation_to_float(candle.high)
+            quotation_to_float(candle.low)
+            quotation_to_float(candle.close)
+
+    benchmark(run)
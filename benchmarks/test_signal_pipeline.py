@@ -0,0 +1,44 @@
+import pytest
+from generators import (BACKCANDLES, INSTRUMENTS, PERIODS, ROUNDS,
+                        generate_candles, generate_ohlcv)
+
+from app.candles.store import CandleStore, candle_from_historic
+from app.strategies.scalpel.signals import add_indicators, add_signal
+
+
+def fill_store(candles) -> CandleStore:
+    store = CandleStore(5)
+    for candle in candles:
+        store.update(candle_from_historic(candle))
+    return store
+
+
+@pytest.mark.parametrize("period", PERIODS)
+def test_create_df(benchmark, period):
+    store = fill_store(generate_candles(PERIODS[period]))
+    benchmark.pedantic(store.to_df, rounds=ROUNDS)
+
+
+@pytest.mark.parametrize("period", PERIODS)
+def test_add_indicators(benchmark, period):
+    df = generate_ohlcv(PERIODS[period])
+    benchmark.pedantic(add_indicators, args=(df,), rounds=ROUNDS)
+
+
+@pytest.mark.parametrize("period", PERIODS)
+def test_add_signal(benchmark, period):
+    df = add_indicators(generate_ohlcv(PERIODS[period]))
+    benchmark.pedantic(add_signal, args=(df, BACKCANDLES), rounds=ROUNDS)
+
+
+@pytest.mark.parametrize("instruments", INSTRUMENTS)
+def test_signal_pipeline_instruments(benchmark, instruments):
+    stores = [
+        fill_store(generate_candles(PERIODS["1d"], seed)) for seed in range(instruments)
+    ]
+
+    def run():
+        for store in stores:
+            add_signal(add_indicators(store.to_df()), BACKCANDLES)
+
+    benchmark.pedantic(run, rounds=ROUNDS)
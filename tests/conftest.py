@@ -0,0 +1,6 @@
+import os
+
+# Settings are read from the environment when app.config is imported.
+os.environ.setdefault("TOKEN", "token")
+os.environ.setdefault("ACCOUNT_ID", "account")
+os.environ.setdefault("SANDBOX", "true")
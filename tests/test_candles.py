@@ -0,0 +1,169 @@
+from datetime import datetime, timedelta, timezone
+from typing import List
+
+import numpy as np
+import pandas as pd
+import pytest
+from pandas import DataFrame
+
+from app.candles.models import Candle
+from app.candles.store import CandleStore, candle_from_historic
+from benchmarks.generators import generate_candles
+
+BASE_INTERVAL = 5
+INTERVALS = [15, 60, 1440]
+COLUMNS = ["Open", "High", "Low", "Close", "Volume"]
+
+
+def get_candles(days: int, seed: int) -> List[Candle]:
+    """Generated candles with some of them missing, as there are no candles
+    for periods without trades."""
+    rng = np.random.default_rng(seed)
+    candles = [candle_from_historic(i) for i in generate_candles(days, seed)]
+    return [i for i in candles if rng.random() > 0.1]
+
+
+def partial(candle: Candle, fraction: float) -> Candle:
+    """An unfinished version of `candle`, as received before it is closed."""
+    close = candle.open + (candle.close - candle.open) * fraction
+    return Candle(
+        time=candle.time,
+        open=candle.open,
+        high=max(candle.open, close),
+        low=min(candle.open, close),
+        close=close,
+        volume=int(candle.volume * fraction),
+    )
+
+
+def stream(candles: List[Candle], seed: int) -> List[Candle]:
+    """Precedes some candles with their unfinished versions."""
+    rng = np.random.default_rng(seed)
+    result = []
+    for candle in candles:
+        for fraction in sorted(rng.random(rng.integers(0, 3))):
+            result.append(partial(candle, fraction))
+        result.append(candle)
+    return result
+
+
+def to_df(candles: List[Candle]) -> DataFrame:
+    return DataFrame(
+        [(i.open, i.high, i.low, i.close, i.volume) for i in candles],
+        index=pd.DatetimeIndex([i.time for i in candles], name="Time"),
+        columns=COLUMNS,
+    )
+
+
+def resample(candles: List[Candle], interval: int) -> DataFrame:
+    return (
+        to_df(candles)
+        .resample(f"{interval}min", origin="epoch")
+        .agg(
+            {
+                "Open": "first",
+                "High": "max",
+                "Low": "min",
+                "Close": "last",
+                "Volume": "sum",
+            }
+        )
+        .dropna()
+        .astype({"Volume": np.int64})
+    )
+
+
+def create_store(candles: List[Candle]) -> CandleStore:
+    store = CandleStore(BASE_INTERVAL, INTERVALS, aggregated_maxlen=None)
+    for candle in candles:
+        store.update(candle)
+    return store
+
+
+@pytest.mark.parametrize("seed", range(4))
+@pytest.mark.parametrize("interval", INTERVALS)
+def test_aggregated_candles_match_resample(seed: int, interval: int):
+    candles = get_candles(12, seed)
+    store = create_store(stream(candles, seed))
+    pd.testing.assert_frame_equal(
+        to_df(store.get_candles(interval)),
+        resample(candles, interval),
+        check_freq=False,
+        check_names=False,
+    )
+
+
+@pytest.mark.parametrize("interval", INTERVALS)
+def test_aggregated_candles_match_resample_at_each_step(interval: int):
+    candles = get_candles(1, 0)
+    store = CandleStore(BASE_INTERVAL, INTERVALS, aggregated_maxlen=None)
+    for candle in stream(candles, 0):
+        store.update(candle)
+        received = [i for i in candles if i.time < candle.time] + [candle]
+        pd.testing.assert_frame_equal(
+            to_df(store.get_candles(interval)),
+            resample(received, interval),
+            check_freq=False,
+            check_names=False,
+        )
+
+
+def test_base_candle_is_replaced_at_the_same_time():
+    candles = get_candles(1, 0)[:10]
+    store = create_store(stream(candles, 0))
+    assert store.get_candles() == candles
+
+
+def test_older_candle_is_ignored():
+    candles = get_candles(1, 0)[:10]
+    store = create_store(candles)
+    store.update(partial(candles[-2], 0.5))
+    assert store.get_candles() == candles
+    assert store.get_candles(15) == create_store(candles).get_candles(15)
+
+
+def test_open_bucket_follows_unfinished_candle():
+    time = datetime(2024, 1, 1, 10, tzinfo=timezone.utc)
+    store = CandleStore(BASE_INTERVAL, [15])
+    store.update(Candle(time, 10, 12, 9, 11, 100))
+    store.update(Candle(time + timedelta(minutes=5), 11, 11, 10, 10, 50))
+    assert store.get_candles(15) == [Candle(time, 10, 12, 9, 10, 150)]
+    # The sealed part of the bucket is kept, only the last candle is replaced.
+    store.update(Candle(time + timedelta(minutes=5), 11, 15, 8, 14, 70))
+    assert store.get_candles(15) == [Candle(time, 10, 15, 8, 14, 170)]
+    store.update(Candle(time + timedelta(minutes=5), 11, 11, 11, 11, 10))
+    assert store.get_candles(15) == [Candle(time, 10, 12, 9, 11, 110)]
+
+
+def test_bucket_is_sealed_by_next_bucket():
+    time = datetime(2024, 1, 1, 10, tzinfo=timezone.utc)
+    store = CandleStore(BASE_INTERVAL, [15])
+    store.update(Candle(time + timedelta(minutes=10), 10, 12, 9, 11, 100))
+    store.update(Candle(time + timedelta(minutes=15), 11, 13, 10, 12, 50))
+    assert store.get_candles(15) == [
+        Candle(time, 10, 12, 9, 11, 100),
+        Candle(time + timedelta(minutes=15), 11, 13, 10, 12, 50),
+    ]
+    # A closed bucket does not change anymore.
+    store.update(Candle(time + timedelta(minutes=15), 12, 20, 1, 12, 10))
+    assert store.get_candles(15)[0] == Candle(time, 10, 12, 9, 11, 100)
+
+
+@pytest.mark.parametrize("split", [1, 57, 58, 300])
+def test_set_state_continues_aggregation(split: int):
+    candles = stream(get_candles(2, 1), 1)
+    store = create_store(candles[:split])
+    restored = CandleStore(BASE_INTERVAL, INTERVALS, aggregated_maxlen=None)
+    assert restored.set_state(store.get_state())
+    for candle in candles[split:]:
+        store.update(candle)
+        restored.update(candle)
+    assert restored.get_candles() == store.get_candles()
+    for interval in INTERVALS:
+        assert restored.get_candles(interval) == store.get_candles(interval)
+
+
+def test_set_state_rejects_other_intervals():
+    store = create_store(get_candles(1, 0)[:10])
+    assert not CandleStore(BASE_INTERVAL, [15, 60]).set_state(store.get_state())
+    assert not CandleStore(1, INTERVALS).set_state(store.get_state())
@@ -0,0 +1,247 @@
+import asyncio
+from typing import Awaitable, Callable, List, Optional
+
+import pytest
+from grpc import StatusCode
+from tinkoff.invest import AioRequestError
+
+from app import client as client_module
+from app.client import TinkoffClient
+from app.config import settings
+
+
+class FakeConnection:
+    """Stands in for a connection opened by tinkoff.invest.AsyncClient.
+
+    Requests are answered by `respond` of the FakeSDK, so tests decide per
+    connection whether a request succeeds, fails or hangs.
+    """
+
+    def __init__(self, sdk: "FakeSDK", index: int):
+        self.sdk = sdk
+        self.index = index
+        self.requests = 0
+        self.closed = asyncio.Event()
+        self.market_data = self
+        self.users = self
+
+    async def __aenter__(self) -> "FakeConnection":
+        return self
+
+    async def __aexit__(self, *args):
+        self.closed.set()
+
+    async def get_last_prices(self, **kwargs):
+        self.requests += 1
+        return await self.sdk.respond(self)
+
+    async def get_info(self):
+        return await self.sdk.check_health(self)
+
+
+async def answer(connection: FakeConnection) -> int:
+    await asyncio.sleep(0)
+    return connection.index
+
+
+def fail(code: StatusCode) -> Callable[[FakeConnection], Awaitable]:
+    async def respond(connection: FakeConnection):
+        await asyncio.sleep(0)
+        raise AioRequestError(code, "", None)
+
+    return respond
+
+
+class FakeSDK:
+    def __init__(self):
+        self.connections: List[FakeConnection] = []
+        self.respond: Callable[[FakeConnection], Awaitable] = answer
+        self.check_health: Callable[[FakeConnection], Awaitable] = answer
+
+    def connect(self, token: str, **kwargs) -> FakeConnection:
+        connection = FakeConnection(self, len(self.connections))
+        self.connections.append(connection)
+        return connection
+
+
+@pytest.fixture
+def sdk(monkeypatch) -> FakeSDK:
+    sdk = FakeSDK()
+    monkeypatch.setattr(client_module, "AsyncClient", sdk.connect)
+    monkeypatch.setattr(settings, "use_candle_history_cache", False)
+    monkeypatch.setattr(settings, "grpc_channels", 1)
+    monkeypatch.setattr(settings, "grpc_retries", 3)
+    monkeypatch.setattr(settings, "grpc_reconnect_delay", 0)
+    monkeypatch.setattr(settings, "grpc_health_check_interval", 0)
+    monkeypatch.setattr(settings, "grpc_close_grace_period", 0)
+    return sdk
+
+
+def run(scenario: Callable[[TinkoffClient], Awaitable], channels: Optional[int] = None):
+    async def main():
+        if channels is not None:
+            settings.grpc_channels = channels
+        client = TinkoffClient("token", sandbox=True)
+        await client.init()
+        try:
+            return await scenario(client)
+        finally:
+            await client.close()
+
+    return asyncio.run(main())
+
+
+def test_requests_are_distributed_round_robin(sdk: FakeSDK):
+    async def scenario(client: TinkoffClient):
+        return [await client.get_last_prices(instrument_id=["FIGI"]) for _ in range(6)]
+
+    assert run(scenario, channels=3) == [0, 1, 2, 0, 1, 2]
+
+
+def test_concurrent_unavailable_requests_reopen_channel_once(sdk: FakeSDK):
+    async def respond(connection: FakeConnection):
+        if connection.index == 0:
+            return await fail(StatusCode.UNAVAILABLE)(connection)
+        return await answer(connection)
+
+    sdk.respond = respond
+
+    async def scenario(client: TinkoffClient):
+        results = await asyncio.gather(
+            *(client.get_last_prices(instrument_id=["FIGI"]) for _ in range(5))
+        )
+        return results, client.channels[0].generation
+
+    assert run(scenario) == ([1] * 5, 1)
+    assert len(sdk.connections) == 2
+    assert sdk.connections[0].requests == 5
+
+
+def test_request_gives_up_after_retries(sdk: FakeSDK):
+    sdk.respond = fail(StatusCode.UNAVAILABLE)
+
+    async def scenario(client: TinkoffClient):
+        await client.get_last_prices(instrument_id=["FIGI"])
+
+    with pytest.raises(AioRequestError):
+        run(scenario)
+    assert sum(i.requests for i in sdk.connections) == settings.grpc_retries + 1
+
+
+def test_other_errors_are_not_retried(sdk: FakeSDK):
+    sdk.respond = fail(StatusCode.INTERNAL)
+
+    async def scenario(client: TinkoffClient):
+        await client.get_last_prices(instrument_id=["FIGI"])
+
+    with pytest.raises(AioRequestError):
+        run(scenario)
+    assert len(sdk.connections) == 1
+    assert sdk.connections[0].requests == 1
+
+
+def test_cancelled_request_is_not_retried_on_same_generation(sdk: FakeSDK):
+    sdk.respond = fail(StatusCode.CANCELLED)
+
+    async def scenario(client: TinkoffClient):
+        await client.get_last_prices(instrument_id=["FIGI"])
+
+    with pytest.raises(AioRequestError):
+        run(scenario)
+    assert len(sdk.connections) == 1
+    assert sdk.connections[0].requests == 1
+
+
+def test_request_cancelled_by_reopen_is_retried(sdk: FakeSDK):
+    started = asyncio.Event()
+
+    async def respond(connection: FakeConnection):
+        if connection.index > 0:
+            return await answer(connection)
+        # The request runs until its connection is closed.
+        started.set()
+        await connection.closed.wait()
+        raise AioRequestError(StatusCode.CANCELLED, "", None)
+
+    sdk.respond = respond
+
+    async def scenario(client: TinkoffClient):
+        request = asyncio.create_task(client.get_last_prices(instrument_id=["FIGI"]))
+        await started.wait()
+        await client.channels[0].reopen(0)
+        return await request
+
+    assert run(scenario) == 1
+    assert [i.requests for i in sdk.connections] == [1, 1]
+
+
+def test_reopened_connection_is_closed_after_grace_period(sdk: FakeSDK, monkeypatch):
+    monkeypatch.setattr(settings, "grpc_close_grace_period", 0.05)
+
+    async def scenario(client: TinkoffClient):
+        channel = client.channels[0]
+        await channel.reopen(0)
+        # A request with an outdated generation does not reopen it again.
+        await channel.reopen(0)
+        old = sdk.connections[0]
+        assert not old.closed.is_set()
+        assert await client.get_last_prices(instrument_id=["FIGI"]) == 1
+        await asyncio.wait_for(old.closed.wait(), timeout=1)
+        assert not channel.closing
+
+    run(scenario)
+    assert len(sdk.connections) == 2
+
+
+def test_close_does_not_wait_for_grace_period(sdk: FakeSDK, monkeypatch):
+    monkeypatch.setattr(settings, "grpc_close_grace_period", 100)
+
+    async def scenario(client: TinkoffClient):
+        channel = client.channels[0]
+        await channel.reopen(0)
+        (task,) = channel.closing
+        await asyncio.wait_for(client.close(), timeout=1)
+        assert task.done()
+        assert not channel.closing
+
+    run(scenario)
+    assert len(sdk.connections) == 2
+    assert all(i.closed.is_set() for i in sdk.connections)
+
+
+def test_health_check_reopens_hanging_channel(sdk: FakeSDK, monkeypatch):
+    monkeypatch.setattr(settings, "grpc_health_check_interval", 0.01)
+    monkeypatch.setattr(settings, "grpc_health_check_timeout", 0.01)
+
+    async def check_health(connection: FakeConnection):
+        if connection.index == 0:
+            await asyncio.Event().wait()
+
+    sdk.check_health = check_health
+
+    async def scenario(client: TinkoffClient):
+        while client.channels[0].generation == 0:
+            await asyncio.sleep(0.01)
+        return client.health_check_task.done()
+
+    assert run(scenario) is False
+    assert len(sdk.connections) == 2
+
+
+def test_health_check_survives_errors(sdk: FakeSDK, monkeypatch):
+    monkeypatch.setattr(settings, "grpc_health_check_interval", 0.01)
+    checks = []
+
+    async def check_health(connection: FakeConnection):
+        checks.append(connection.index)
+        raise RuntimeError("unexpected")
+
+    sdk.check_health = check_health
+
+    async def scenario(client: TinkoffClient):
+        while len(checks) < 3:
+            await asyncio.sleep(0.01)
+        return client.health_check_task.done(), client.channels[0].generation
+
+    assert run(scenario) == (False, 0)
+    assert len(sdk.connections) == 1
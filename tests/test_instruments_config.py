@@ -0,0 +1,78 @@
+from pathlib import Path
+
+import pytest
+from pydantic import ValidationError
+
+from app.instruments_config.models import InstrumentsConfig, StrategyConfig
+from app.instruments_config.parser import get_instruments, project_dir
+from app.strategies.scalpel.models import ScalpelStrategyConfig
+
+
+def instrument(figi: str = "BBG004730N88", name: str = "scalpel", **parameters):
+    return {"figi": figi, "strategy": {"name": name, "parameters": parameters}}
+
+
+def test_template_is_valid():
+    config = get_instruments(
+        Path(project_dir, "instruments_config_scalpell.json.template")
+    )
+    assert [i.figi for i in config.instruments] == ["BBG004730N88"]
+
+
+def test_defaults():
+    config = ScalpelStrategyConfig()
+    assert config.backcandles == 15
+    assert config.candle_interval == 5
+    assert config.confirmation_intervals == []
+
+
+@pytest.mark.parametrize(
+    "parameters",
+    [
+        {},
+        {"backcandles": 10},
+        {"days_back_to_consider": 30, "quantity_limit": 10, "check_data": 60},
+        {"candle_interval": 1, "confirmation_intervals": [5, 60]},
+    ],
+)
+def test_valid_parameters(parameters: dict):
+    config = InstrumentsConfig.model_validate(
+        {"instruments": [instrument(**parameters)]}
+    )
+    assert config.instruments[0].strategy.parameters == parameters
+
+
+@pytest.mark.parametrize(
+    "parameters, error",
+    [
+        ({"unknown": 1}, "extra_forbidden"),
+        ({"backcandles": 0}, "greater_than"),
+        ({"days_back_to_consider": 0}, "greater_than"),
+        ({"stop_loss_percent": 2}, "less_than_equal"),
+        ({"candle_interval": 15}, "candle_interval must be one of"),
+        ({"confirmation_intervals": [5]}, "must be a multiple"),
+        ({"confirmation_intervals": [12]}, "must be a multiple"),
+    ],
+)
+def test_invalid_parameters(parameters: dict, error: str):
+    with pytest.raises(ValidationError, match=error):
+        StrategyConfig.model_validate({"name": "scalpel", "parameters": parameters})
+
+
+def test_unsupported_strategy():
+    with pytest.raises(ValidationError, match="Strategy unknown is not supported"):
+        StrategyConfig.model_validate({"name": "unknown"})
+
+
+def test_unknown_instrument_key():
+    with pytest.raises(ValidationError, match="extra_forbidden"):
+        InstrumentsConfig.model_validate(
+            {"instruments": [{**instrument(), "enabled": True}]}
+        )
+
+
+def test_duplicate_instruments():
+    with pytest.raises(ValidationError, match="only once per strategy"):
+        InstrumentsConfig.model_validate(
+            {"instruments": [instrument(), instrument(quantity_limit=5)]}
+        )
@@ -0,0 +1,86 @@
+import json
+import logging
+
+import pytest
+
+from app.logger import FigiLoggerAdapter, JsonFormatter, TextFormatter
+
+
+class ListHandler(logging.Handler):
+    def __init__(self):
+        super().__init__()
+        self.records = []
+
+    def emit(self, record: logging.LogRecord):
+        self.records.append(record)
+
+
+@pytest.fixture
+def handler():
+    logger = logging.getLogger("test_logger")
+    handler = ListHandler()
+    logger.addHandler(handler)
+    logger.setLevel(logging.INFO)
+    yield handler
+    logger.removeHandler(handler)
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = {"now": 1000.0}
+    monkeypatch.setattr("app.logger.time.monotonic", lambda: clock["now"])
+    return clock
+
+
+def messages(handler: ListHandler) -> list:
+    return [(i.getMessage(), i.suppressed) for i in handler.records]
+
+
+def test_sample_suppresses_repeated_messages(handler, clock):
+    adapter = FigiLoggerAdapter(logging.getLogger("test_logger"), "FIGI", 60)
+    for _ in range(3):
+        adapter.sample(logging.INFO, "No signal. figi=%s", "FIGI")
+    clock["now"] += 60
+    adapter.sample(logging.INFO, "No signal. figi=%s", "FIGI")
+    assert messages(handler) == [
+        ("No signal. figi=FIGI", 0),
+        ("No signal. figi=FIGI", 2),
+    ]
+    assert handler.records[0].figi == "FIGI"
+
+
+def test_sample_separates_keys(handler, clock):
+    adapter = FigiLoggerAdapter(logging.getLogger("test_logger"), "FIGI", 60)
+    for interval in [15, 60, 15, 60]:
+        adapter.sample(
+            logging.INFO, "Not confirmed on %s min candles", interval, key=interval
+        )
+    assert messages(handler) == [
+        ("Not confirmed on 15 min candles", 0),
+        ("Not confirmed on 60 min candles", 0),
+    ]
+
+
+def test_sample_without_interval_logs_everything(handler):
+    adapter = FigiLoggerAdapter(logging.getLogger("test_logger"), "FIGI")
+    for _ in range(3):
+        adapter.sample(logging.INFO, "No signal")
+    adapter.sample(logging.DEBUG, "Below the level")
+    assert messages(handler) == [("No signal", 0)] * 3
+
+
+def test_formatters_show_suppressed(handler, clock):
+    adapter = FigiLoggerAdapter(logging.getLogger("test_logger"), "FIGI", 60)
+    adapter.sample(logging.INFO, "No signal")
+    adapter.sample(logging.INFO, "No signal")
+    clock["now"] += 60
+    adapter.sample(logging.INFO, "No signal")
+    adapter.info("Plain message")
+    first, sampled, plain = handler.records
+
+    assert TextFormatter().format(first).endswith(": No signal")
+    assert TextFormatter().format(sampled).endswith(": No signal (suppressed=1)")
+    assert TextFormatter().format(plain).endswith(": Plain message")
+    assert json.loads(JsonFormatter().format(sampled))["suppressed"] == 1
+    assert "suppressed" not in json.loads(JsonFormatter().format(first))
+    assert json.loads(JsonFormatter().format(plain))["figi"] == "FIGI"
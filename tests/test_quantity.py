@@ -0,0 +1,27 @@
+import pytest
+
+from app.utils.quantity import is_quantity_valid, quantity_to_lots
+
+
+@pytest.mark.parametrize(
+    "quantity, lot, lots",
+    [
+        (10, 1, 10),
+        (10, 10, 1),
+        # A limit that is not a multiple of the lot buys the whole lots that fit.
+        (15, 10, 1),
+        (29, 10, 2),
+        (9, 10, 0),
+        (0, 10, 0),
+    ],
+)
+def test_quantity_to_lots(quantity: int, lot: int, lots: int):
+    assert quantity_to_lots(quantity, lot) == lots
+
+
+@pytest.mark.parametrize(
+    "quantity, valid",
+    [(1, True), (100, True), (0, False), (-1, False), (1.0, False), (None, False)],
+)
+def test_is_quantity_valid(quantity, valid: bool):
+    assert is_quantity_valid(quantity) is valid
@@ -0,0 +1,40 @@
+import pytest
+from tinkoff.invest import MoneyValue, Quotation
+
+from app.utils.quotation import (float_to_nano, float_to_quotation,
+                                 nano_to_quotation, quotation_to_float,
+                                 quotation_to_nano)
+
+
+@pytest.mark.parametrize(
+    "value, quotation",
+    [
+        (0.0, Quotation(units=0, nano=0)),
+        (123.45, Quotation(units=123, nano=450_000_000)),
+        (0.1, Quotation(units=0, nano=100_000_000)),
+        (-0.5, Quotation(units=0, nano=-500_000_000)),
+        (-12.000000001, Quotation(units=-12, nano=-1)),
+    ],
+)
+def test_float_to_quotation(value: float, quotation: Quotation):
+    assert float_to_quotation(value) == quotation
+    assert quotation_to_float(quotation) == value
+
+
+@pytest.mark.parametrize("nano", [0, 1, -1, 999_999_999, -1_000_000_001, 10**15])
+def test_nano_round_trip(nano: int):
+    quotation = nano_to_quotation(nano)
+    assert abs(quotation.nano) < 1_000_000_000
+    assert quotation.units * quotation.nano >= 0
+    assert quotation_to_nano(quotation) == nano
+
+
+def test_money_value_to_float():
+    assert (
+        quotation_to_float(MoneyValue(currency="rub", units=5, nano=10)) == 5.00000001
+    )
+
+
+def test_float_to_nano_is_exact():
+    assert float_to_nano(0.3) == 300_000_000
+    assert float_to_nano(1.1) == 1_100_000_000
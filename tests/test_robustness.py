@@ -0,0 +1,79 @@
+import itertools
+import json
+
+import numpy as np
+import pytest
+from pandas import DataFrame
+
+from app.backtest import robustness
+from app.backtest.robustness import (SIMULATION_COLUMNS, init_worker,
+                                     monte_carlo_scenarios,
+                                     perturbation_scenarios, run_monte_carlo,
+                                     run_scenarios, walk_forward_scenarios)
+from app.strategies.scalpel.signals import add_indicators, add_signal
+from benchmarks.generators import BACKCANDLES, generate_ohlcv
+
+GRID = {"slcoef": [1.0, 1.5], "tpsl_ratio": [1.5]}
+
+
+@pytest.fixture(scope="module")
+def df() -> DataFrame:
+    return add_signal(add_indicators(generate_ohlcv(10, 0)), BACKCANDLES)
+
+
+def read_results(path) -> list:
+    with open(path) as f:
+        return [json.loads(line) for line in f]
+
+
+def test_run_scenarios(df: DataFrame, tmp_path):
+    output = tmp_path / "robustness.jsonl"
+    train_bars, test_bars = 600, 300
+    scenarios = itertools.chain(
+        walk_forward_scenarios(len(df), train_bars, test_bars, GRID),
+        monte_carlo_scenarios(25, chunk_size=10),
+        perturbation_scenarios(3),
+    )
+    written = run_scenarios(df, scenarios, str(output), workers=2, max_pending=2)
+
+    results = read_results(output)
+    windows = (len(df) - train_bars - test_bars) // test_bars + 1
+    assert written == len(results) == windows + 25 + 3
+    kinds = [i["kind"] for i in results]
+    assert kinds.count("walk_forward") == windows
+    assert kinds.count("monte_carlo") == 25
+    assert kinds.count("perturbation") == 3
+
+    walk_forward = sorted(
+        (i for i in results if i["kind"] == "walk_forward"), key=lambda i: i["window"]
+    )
+    for window, result in enumerate(walk_forward):
+        start = window * test_bars
+        assert result["window"] == window
+        assert result["train_start"] == str(df.index[start])
+        assert result["test_start"] == str(df.index[start + train_bars])
+        assert result["test_end"] == str(df.index[start + train_bars + test_bars - 1])
+        assert result["params"]["slcoef"] in GRID["slcoef"]
+    assert sorted(i["scenario"] for i in results if i["kind"] == "monte_carlo") == list(
+        range(25)
+    )
+
+
+def test_run_scenarios_replaces_output(df: DataFrame, tmp_path):
+    output = tmp_path / "robustness.jsonl"
+    output.write_text('{"kind": "stale"}\n')
+    written = run_scenarios(df, perturbation_scenarios(2), str(output), workers=1)
+    assert written == 2
+    assert [i["kind"] for i in read_results(output)] == ["perturbation"] * 2
+
+
+def test_monte_carlo_batches(df: DataFrame, monkeypatch):
+    returns = np.random.default_rng(0).normal(0, 0.01, 50)
+    init_worker(df[SIMULATION_COLUMNS], returns, 100_000)
+    scenario = {"kind": "monte_carlo", "first": 10, "count": 7, "seed": 1}
+    expected = run_monte_carlo(scenario)
+    # Scenarios are split into batches of 2, the random stream is the same.
+    monkeypatch.setattr(robustness, "MONTE_CARLO_BATCH_ELEMENTS", 100)
+    assert run_monte_carlo(scenario) == expected
+    assert [i["scenario"] for i in expected] == list(range(10, 17))
+    assert all(0 <= i["max_drawdown_pct"] < 100 for i in expected)
@@ -0,0 +1,84 @@
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+
+import pytest
+
+from app.candles.models import Candle
+from app.strategies.scalpel.scalpel import ScalpelStrategy
+from app.strategies.snapshots import save_snapshot
+
+
+@pytest.fixture
+def strategy(tmp_path, monkeypatch) -> ScalpelStrategy:
+    # StatsHandler opens stats.db in the working directory.
+    monkeypatch.chdir(tmp_path)
+    return ScalpelStrategy("BBG004730N88", backcandles=10, confirmation_intervals=[15])
+
+
+def test_backcandles_parameter(strategy: ScalpelStrategy):
+    assert strategy.config.backcandles == 10
+
+
+def test_reconfigure_keeps_candles(strategy: ScalpelStrategy):
+    candles = strategy.candles
+    strategy.reconfigure(backcandles=20, quantity_limit=5, confirmation_intervals=[15])
+    assert strategy.config.backcandles == 20
+    assert strategy.config.quantity_limit == 5
+    assert strategy.candles is candles
+
+
+@pytest.mark.parametrize(
+    "parameters",
+    [
+        {"candle_interval": 1, "confirmation_intervals": [15]},
+        {"confirmation_intervals": [15, 60]},
+        {"days_back_to_consider": 2, "confirmation_intervals": [15]},
+    ],
+)
+def test_reconfigure_resets_candles(strategy: ScalpelStrategy, parameters: dict):
+    candles = strategy.candles
+    strategy.reconfigure(**parameters)
+    assert strategy.candles is not candles
+    assert strategy.candles.base_interval == strategy.config.candle_interval
+    assert list(strategy.candles.aggregators) == parameters["confirmation_intervals"]
+
+
+def save_strategy_snapshot(path: Path, days_back_to_consider: int, age: timedelta):
+    strategy = ScalpelStrategy(
+        "BBG004730N88", days_back_to_consider=days_back_to_consider
+    )
+    start = datetime.now(timezone.utc) - age - timedelta(hours=1)
+    for i in range(12):
+        strategy.candles.update(
+            Candle(start + timedelta(minutes=5 * i), 10, 11, 9, 10, 100)
+        )
+    snapshot = strategy.get_snapshot()
+    snapshot["saved_at"] -= age
+    snapshot["candles_since"] -= age
+    save_snapshot(path, snapshot)
+
+
+@pytest.mark.parametrize(
+    "saved_days, days, age, restored",
+    [
+        (1, 1, timedelta(minutes=5), True),
+        (1, 1, timedelta(days=3), True),
+        (30, 1, timedelta(minutes=5), True),
+        (1, 30, timedelta(minutes=5), False),
+        (1, 2, timedelta(hours=12), False),
+    ],
+)
+def test_restore_snapshot_covering_window(
+    strategy: ScalpelStrategy,
+    tmp_path: Path,
+    saved_days: int,
+    days: int,
+    age: timedelta,
+    restored: bool,
+):
+    path = tmp_path / "snapshot.pickle"
+    save_strategy_snapshot(path, saved_days, age)
+    strategy = ScalpelStrategy("BBG004730N88", days_back_to_consider=days)
+    strategy.snapshot_path = path
+    strategy.restore_snapshot()
+    assert len(strategy.candles.candles) == (12 if restored else 0)
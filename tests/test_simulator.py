@@ -0,0 +1,41 @@
+import numpy as np
+import pandas as pd
+import pytest
+from backtesting import Backtest
+from pandas import DataFrame
+
+from app.backtest.simulator import simulate
+from app.backtest.strategy import ScalpelBacktestStrategy
+from app.strategies.scalpel.signals import add_indicators, add_signal
+from benchmarks.generators import BACKCANDLES, generate_ohlcv
+
+DAYS = 18
+TRADE_COLUMNS = ["Size", "EntryBar", "ExitBar", "EntryPrice", "ExitPrice", "PnL"]
+
+
+def generate_df(seed: int) -> DataFrame:
+    return add_signal(add_indicators(generate_ohlcv(DAYS, seed)), BACKCANDLES)
+
+
+@pytest.mark.parametrize("seed", range(6))
+@pytest.mark.parametrize("commission", [0.0, 0.0005])
+@pytest.mark.parametrize("slcoef, tpsl_ratio", [(1.0, 1.0), (1.5, 2.0), (0.5, 1.5)])
+def test_simulate_matches_backtesting(seed, commission, slcoef, tpsl_ratio):
+    df = generate_df(seed)
+    stats = Backtest(
+        df, ScalpelBacktestStrategy, cash=100_000, commission=commission
+    ).run(slcoef=slcoef, TPSLRatio=tpsl_ratio)
+    trades, equity = simulate(
+        df,
+        cash=100_000,
+        commission=commission,
+        slcoef=slcoef,
+        tpsl_ratio=tpsl_ratio,
+    )
+
+    expected = stats["_trades"][TRADE_COLUMNS].reset_index(drop=True)
+    assert len(trades) > 0
+    pd.testing.assert_frame_equal(
+        trades[TRADE_COLUMNS], expected, check_dtype=False, check_exact=False
+    )
+    np.testing.assert_allclose(equity, stats["_equity_curve"]["Equity"].to_numpy())
@@ -0,0 +1,156 @@
+from datetime import datetime, timezone
+
+import pytest
+
+from app.sqlite.client import SQLiteClient
+from app.stats.migrations import MIGRATIONS
+from app.stats.models import (DIRECTION_BUY, DIRECTION_SELL,
+                              ORDER_EXECUTION_REPORT_STATUS)
+from app.stats.sqlite_client import StatsSQLiteClient
+
+STATUS_NEW = ORDER_EXECUTION_REPORT_STATUS[4]
+STATUS_PARTIALLY_FILL = ORDER_EXECUTION_REPORT_STATUS[5]
+STATUS_FILL = ORDER_EXECUTION_REPORT_STATUS[1]
+STATUS_CANCELLED = ORDER_EXECUTION_REPORT_STATUS[3]
+TODAY = datetime.now(timezone.utc).date().isoformat()
+
+
+@pytest.fixture
+def db() -> StatsSQLiteClient:
+    return StatsSQLiteClient(":memory:")
+
+
+def add_order(db: StatsSQLiteClient, order_id: str, **kwargs):
+    order = {
+        "ticker": "SBER",
+        "figi": "BBG004730N88",
+        "order_direction": DIRECTION_BUY,
+        "price": 1000.0,
+        "quantity": 1,
+        "status": STATUS_FILL,
+        "lot": 10,
+    }
+    db.add_order(order_id=order_id, **{**order, **kwargs})
+
+
+def get_pnl_daily(db: StatsSQLiteClient) -> list:
+    return db.db_client.execute_select(
+        """SELECT figi, buy_amount, sell_amount, buy_quantity, sell_quantity,
+            commission, orders
+        FROM pnl_daily ORDER BY figi"""
+    )
+
+
+def test_migrates_baseline_orders():
+    db_client = SQLiteClient(":memory:")
+    db_client.connect()
+    db_client.execute(
+        """CREATE TABLE orders (
+            id TEXT PRIMARY KEY,
+            ticker TEXT,
+            figi TEXT,
+            direction TEXT,
+            price REAL,
+            quantity INTEGER,
+            status TEXT)"""
+    )
+    db_client.execute_insert(
+        "INSERT INTO orders VALUES (?, ?, ?, ?, ?, ?, ?)",
+        ("1", "SBER", "BBG004730N88", DIRECTION_BUY, 2500.0, 1, STATUS_FILL),
+    )
+    db = StatsSQLiteClient.__new__(StatsSQLiteClient)
+    db.db_client = db_client
+    db._migrate()
+
+    assert db_client.execute_select_one("PRAGMA user_version") == (len(MIGRATIONS),)
+    assert db.get_order() == [
+        (
+            "1",
+            "SBER",
+            "BBG004730N88",
+            DIRECTION_BUY,
+            2500.0,
+            1,
+            STATUS_FILL,
+            1,
+            None,
+            None,
+            0,
+            None,
+            None,
+            None,
+        )
+    ]
+    # Orders stored before the migration have no execution details.
+    assert get_pnl_daily(db) == []
+
+    add_order(
+        db, "2", executed_price=250.0, executed_amount=2500.0, executed_quantity=1
+    )
+    assert get_pnl_daily(db) == [("BBG004730N88", 2500.0, 0, 10, 0, 0, 1)]
+
+
+def test_migration_is_applied_once(db: StatsSQLiteClient):
+    add_order(
+        db, "1", executed_price=100.0, executed_amount=1000.0, executed_quantity=1
+    )
+    db._migrate()
+    assert len(db.get_order()) == 1
+    assert get_pnl_daily(db) == [("BBG004730N88", 1000.0, 0, 10, 0, 0, 1)]
+
+
+def test_new_order_without_executions_is_not_counted(db: StatsSQLiteClient):
+    add_order(db, "1", status=STATUS_NEW)
+    db.update_order("1", STATUS_CANCELLED, None, None, 0, None)
+    assert get_pnl_daily(db) == []
+
+
+def test_partial_fill_then_cancel(db: StatsSQLiteClient):
+    add_order(db, "1", quantity=3, status=STATUS_NEW)
+    db.update_order("1", STATUS_PARTIALLY_FILL, 100.0, 1000.0, 1, 0.5)
+    db.update_order("1", STATUS_PARTIALLY_FILL, 101.0, 2020.0, 2, 1.0)
+    db.update_order("1", STATUS_CANCELLED, 101.0, 2020.0, 2, 1.0)
+    assert get_pnl_daily(db) == [("BBG004730N88", 2020.0, 0, 20, 0, 1.0, 1)]
+
+
+def test_commission_received_after_fill(db: StatsSQLiteClient):
+    add_order(
+        db, "1", executed_price=100.0, executed_amount=1000.0, executed_quantity=1
+    )
+    db.update_order("1", STATUS_FILL, 100.0, 1000.0, 1, 0.5)
+    assert get_pnl_daily(db) == [("BBG004730N88", 1000.0, 0, 10, 0, 0.5, 1)]
+
+
+def test_get_pnl_by_ticker(db: StatsSQLiteClient):
+    add_order(
+        db,
+        "1",
+        executed_price=100.0,
+        executed_amount=2000.0,
+        executed_quantity=2,
+        commission=1.0,
+    )
+    add_order(db, "2", order_direction=DIRECTION_SELL, status=STATUS_NEW)
+    db.update_order("2", STATUS_PARTIALLY_FILL, 110.0, 1100.0, 1, 0.5)
+    db.update_order("2", STATUS_FILL, 110.0, 2200.0, 2, 1.1)
+    add_order(
+        db,
+        "3",
+        ticker="GAZP",
+        figi="BBG004730RP0",
+        lot=1,
+        executed_price=150.0,
+        executed_amount=300.0,
+        executed_quantity=2,
+        commission=0.2,
+    )
+
+    rows = db.get_pnl_by_ticker(TODAY)
+    assert [row[0] for row in rows] == ["SBER", "GAZP"]
+    sber, gazp = rows
+    assert sber == pytest.approx(("SBER", 197.9, 2000.0, 2200.0, 0, 2.1, 2))
+    assert gazp == pytest.approx(("GAZP", -300.2, 300.0, 0, 2, 0.2, 1))
+    assert db.get_pnl_by_day(TODAY) == [
+        pytest.approx((TODAY, -102.3, 2300.0, 2200.0, 2, 2.3, 3))
+    ]
+    assert db.get_pnl_by_ticker("9999-01-01") == []
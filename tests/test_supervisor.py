@@ -0,0 +1,139 @@
+import asyncio
+from typing import List
+
+import pytest
+
+from app.instruments_config.models import InstrumentsConfig
+from app.strategies import supervisor
+from app.strategies.base import BaseStrategy
+from app.strategies.supervisor import StrategySupervisor
+
+
+class FakeStrategy(BaseStrategy):
+    def __init__(self, figi: str, *args, **kwargs):
+        self.figi = figi
+        self.parameters = kwargs
+        self.reconfigured: List[dict] = []
+        self.started = False
+        self.cancelled = False
+
+    async def start(self):
+        self.started = True
+        try:
+            await asyncio.Event().wait()
+        except asyncio.CancelledError:
+            self.cancelled = True
+            raise
+
+    def reconfigure(self, *args, **kwargs):
+        self.parameters = kwargs
+        self.reconfigured.append(kwargs)
+
+
+class FakeWatcher:
+    def __init__(self, configs: List[InstrumentsConfig]):
+        self.configs = configs
+
+    async def watch(self):
+        for config in self.configs:
+            yield config
+        await asyncio.Event().wait()
+
+
+@pytest.fixture(autouse=True)
+def fake_strategy(monkeypatch):
+    monkeypatch.setattr(
+        supervisor,
+        "resolve_strategy",
+        lambda strategy_name, figi, **kwargs: FakeStrategy(figi, **kwargs),
+    )
+
+
+def make_config(**instruments: dict) -> InstrumentsConfig:
+    return InstrumentsConfig.model_validate(
+        {
+            "instruments": [
+                {
+                    "figi": figi,
+                    "strategy": {"name": "scalpel", "parameters": parameters},
+                }
+                for figi, parameters in instruments.items()
+            ]
+        }
+    )
+
+
+def test_apply_starts_strategies():
+    async def scenario():
+        strategies = StrategySupervisor()
+        strategies.apply(make_config(A={"quantity_limit": 1}, B={}))
+        await asyncio.sleep(0)
+        assert set(strategies.strategies) == {("A", "scalpel"), ("B", "scalpel")}
+        assert all(i.started for i in strategies.strategies.values())
+        assert strategies.strategies["A", "scalpel"].parameters == {"quantity_limit": 1}
+        await strategies.stop()
+
+    asyncio.run(scenario())
+
+
+def test_apply_stops_removed_and_reconfigures_changed():
+    async def scenario():
+        strategies = StrategySupervisor()
+        strategies.apply(make_config(A={}, B={}, C={"backcandles": 10}))
+        await asyncio.sleep(0)
+        a, b, c = (strategies.strategies[i, "scalpel"] for i in "ABC")
+        task_b = strategies.tasks["B", "scalpel"]
+
+        strategies.apply(make_config(A={}, C={"backcandles": 20}, D={}))
+        await asyncio.sleep(0)
+
+        assert set(strategies.strategies) == {
+            ("A", "scalpel"),
+            ("C", "scalpel"),
+            ("D", "scalpel"),
+        }
+        assert task_b.cancelled() and b.cancelled
+        assert a.reconfigured == []
+        assert c.reconfigured == [{"backcandles": 20}]
+        assert strategies.strategies["C", "scalpel"] is c
+        assert strategies.configs["C", "scalpel"].strategy.parameters == {
+            "backcandles": 20
+        }
+        assert strategies.strategies["D", "scalpel"].started
+        await strategies.stop()
+
+    asyncio.run(scenario())
+
+
+def test_stop_cancels_all_strategies():
+    async def scenario():
+        strategies = StrategySupervisor()
+        strategies.apply(make_config(A={}, B={}))
+        await asyncio.sleep(0)
+        started = list(strategies.strategies.values())
+        await strategies.stop()
+        assert all(i.cancelled for i in started)
+        assert strategies.tasks == {}
+        assert strategies.strategies == {}
+        assert strategies.configs == {}
+
+    asyncio.run(scenario())
+
+
+def test_run_applies_watched_configs_and_stops_on_cancel():
+    async def scenario():
+        strategies = StrategySupervisor()
+        watcher = FakeWatcher([make_config(A={"quantity_limit": 2}, B={})])
+        task = asyncio.create_task(strategies.run(make_config(A={}), watcher))
+        await asyncio.sleep(0.01)
+        assert set(strategies.strategies) == {("A", "scalpel"), ("B", "scalpel")}
+        started = list(strategies.strategies.values())
+        assert started[0].reconfigured == [{"quantity_limit": 2}]
+
+        task.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await task
+        assert strategies.tasks == {}
+        assert all(i.cancelled for i in started)
+
+    asyncio.run(scenario())
@@ -7,10 +7,13 @@ from app.client import client
 
 async def get_figi_by_ticker(ticker: str) -> str:
     await client.init()
-    x = DataFrame(
-        (await client.get_all_shares()).instruments,
-        columns=["figi", "ticker", "name", "class_code"],
-    )
+    try:
+        x = DataFrame(
+            (await client.get_all_shares()).instruments,
+            columns=["figi", "ticker", "name", "class_code"],
+        )
+    finally:
+        await client.close()
     return x[x["ticker"] == ticker].figi
 
 
@@ -0,0 +1,35 @@
+import argparse
+import itertools
+
+from app.backtest.historical import create_df
+from app.backtest.robustness import (monte_carlo_scenarios,
+                                     perturbation_scenarios, run_scenarios,
+                                     walk_forward_scenarios)
+from app.strategies.scalpel.signals import add_signal
+
+GRID = {
+    "slcoef": [0.5, 1.0, 1.5, 2.0],
+    "tpsl_ratio": [1.0, 1.5, 2.0, 3.0],
+}
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--data", default="data")
+    parser.add_argument("--output", default="robustness.jsonl")
+    parser.add_argument("--workers", type=int)
+    parser.add_argument("--backcandles", type=int, default=15)
+    parser.add_argument("--train-bars", type=int, default=20_000)
+    parser.add_argument("--test-bars", type=int, default=5_000)
+    parser.add_argument("--monte-carlo", type=int, default=10_000)
+    parser.add_argument("--perturbations", type=int, default=1_000)
+    args = parser.parse_args()
+
+    df = add_signal(create_df(args.data), backcandles=args.backcandles)
+    scenarios = itertools.chain(
+        walk_forward_scenarios(len(df), args.train_bars, args.test_bars, GRID),
+        monte_carlo_scenarios(args.monte_carlo),
+        perturbation_scenarios(args.perturbations),
+    )
+    written = run_scenarios(df, scenarios, args.output, workers=args.workers)
+    print(f"{written} results written to {args.output}")
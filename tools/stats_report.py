@@ -0,0 +1,27 @@
+import argparse
+from datetime import date, timedelta
+
+from pandas import DataFrame
+
+from app.stats.sqlite_client import StatsSQLiteClient
+
+COLUMNS = ["PnL", "Buy amount", "Sell amount", "Position", "Commission", "Orders"]
+
+
+def get_report(db_name: str, days: int, group_by: str) -> DataFrame:
+    db = StatsSQLiteClient(db_name=db_name)
+    since = (date.today() - timedelta(days=days)).isoformat()
+    if group_by == "ticker":
+        rows = db.get_pnl_by_ticker(since)
+    else:
+        rows = db.get_pnl_by_day(since)
+    return DataFrame(rows, columns=[group_by.capitalize()] + COLUMNS)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--db", default="stats.db")
+    parser.add_argument("--days", type=int, default=30)
+    parser.add_argument("--group-by", choices=["ticker", "day"], default="ticker")
+    args = parser.parse_args()
+    print(get_report(args.db, args.days, args.group_by).to_string(index=False))